@@ -7,31 +7,683 @@ from flask import Flask, request, jsonify
 import logging
 import sys
 import os
+import json
+import hmac
+import queue
+import socket
+from bisect import bisect_left
+from collections import OrderedDict, deque
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
 import requests
 import threading
 import time
 
+try:
+    import fcntl
+except ImportError:  # no flock: every replica considers itself the leader
+    fcntl = None
+
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from dca_telegram_handler import handle_dca_callback
+from dca_snapshot import SnapshotReader
+import dca_metrics
 
 app = Flask(__name__)
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Store last status for monitoring
-status_log = []
-
 # Get data directory from environment or use current directory
 DATA_DIR = os.getenv('DATA_DIR', '/freqtrade/user_data')
 
+# Status log settings
+STATUS_LOG_CAPACITY = int(os.getenv('STATUS_LOG_CAPACITY', '1000'))
+STATUS_LOG_FILE = os.getenv('STATUS_LOG_FILE', os.path.join(DATA_DIR, 'dca_webhook_status.jsonl'))
+STATUS_LOG_MAX_BYTES = int(os.getenv('STATUS_LOG_MAX_BYTES', str(5 * 1024 * 1024)))
+STATUS_LOG_BACKUPS = int(os.getenv('STATUS_LOG_BACKUPS', '3'))
+
+# Update ingestion: "polling" (getUpdates) or "webhook" (Telegram pushes to /telegram/update)
+TELEGRAM_UPDATE_MODE = os.getenv('TELEGRAM_UPDATE_MODE', 'polling').lower()
+TELEGRAM_WEBHOOK_URL = os.getenv('TELEGRAM_WEBHOOK_URL', '')
+TELEGRAM_WEBHOOK_SECRET = os.getenv('TELEGRAM_WEBHOOK_SECRET', '')
+
+# Who may decide DCAs: AUTHORIZED_USERS (JSON list or comma separated user ids),
+# otherwise only clicks from TELEGRAM_CHAT_ID
+TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID', '')
+AUTHORIZED_USERS = os.getenv('AUTHORIZED_USERS', '')
+
+# Unix socket of the running strategy; decisions are pushed there (file store stays the fallback)
+DECISION_SOCKET = os.getenv('DCA_DECISION_SOCKET', os.path.join(DATA_DIR, 'dca_decisions.sock'))
+
+# Shared append-only DCA span log (also written by the strategy); empty disables tracing
+DCA_TRACE_FILE = os.getenv('DCA_TRACE_FILE', os.path.join(DATA_DIR, 'dca_trace.jsonl'))
+
+# Memory-mapped indicator snapshot published by the strategy every candle
+SNAPSHOT_FILE = os.getenv('DCA_SNAPSHOT_FILE', os.path.join(DATA_DIR, 'indicator_snapshot.bin'))
+
+# Bots served by this webhook: "name=data_dir,name2=data_dir2". Callbacks carry
+# "dca_<action>_<name>|<dca id>"; un-namespaced ones go to the first bot.
+# Default: a single bot using the paths above.
+DCA_BOTS = os.getenv('DCA_BOTS', '')
+DEFAULT_BOT = 'default'
+
+# Durable getUpdates offset and duplicate suppression
+UPDATE_OFFSET_FILE = os.getenv('UPDATE_OFFSET_FILE', os.path.join(DATA_DIR, 'dca_webhook_offset.json'))
+IDEMPOTENCY_CACHE_SIZE = int(os.getenv('IDEMPOTENCY_CACHE_SIZE', '2048'))
+
+# Replicas sharing DATA_DIR elect one getUpdates poller through this lease
+LEASE_FILE = os.getenv('WEBHOOK_LEASE_FILE', os.path.join(DATA_DIR, 'dca_webhook.lease'))
+LEASE_TTL = float(os.getenv('WEBHOOK_LEASE_TTL', '10'))
+REPLICA_ID = os.getenv('WEBHOOK_REPLICA_ID', f"{socket.gethostname()}:{os.getpid()}")
+
 # Polling state
 last_update_id = 0
 polling_active = False
 
+# Push mode state: updates are acknowledged immediately and processed here
+update_queue = queue.Queue()
+
+
+def _parse_since(value):
+    """Parse a `since` query value (ISO timestamp or epoch seconds) into epoch seconds"""
+    if value is None or value == '':
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+class _IdIndex:
+    """Ascending ids of the live entries under one index key; front evictions are amortized O(1)"""
+
+    __slots__ = ('ids', 'start')
+
+    def __init__(self):
+        self.ids = []
+        self.start = 0
+
+    def __len__(self):
+        return len(self.ids) - self.start
+
+    def append(self, entry_id):
+        self.ids.append(entry_id)
+
+    def popleft(self):
+        self.start += 1
+        if self.start >= 64 and self.start * 2 >= len(self.ids):
+            del self.ids[:self.start]
+            self.start = 0
+
+    def before(self, upper):
+        """Ids below `upper`, newest first"""
+        position = bisect_left(self.ids, upper, self.start)
+        return (self.ids[i] for i in range(position - 1, self.start - 1, -1))
+
+
+class StatusLog:
+    """
+    Thread-safe fixed-capacity ring buffer of callback results, backed by a
+    rotated JSONL file shared by all replicas.
+
+    Every entry is appended to the file as it is added, under a file lock,
+    after reading whatever other replicas appended first. Its id is the next
+    one after the file's last entry, so ids are the same on every replica and
+    double as pagination cursors that survive restarts and failovers. Other
+    replicas pick new entries up by reading only the bytes added since their
+    last read. Secondary indexes (user id, DCA id, pair, bot) hold the ids of
+    live entries in ascending order in lists, so eviction is amortized O(1)
+    and a filtered query is one bisect plus a walk over the entries it returns.
+    """
+
+    INDEXED_FIELDS = ('user_id', 'dca_id', 'pair', 'bot')
+
+    def __init__(self, capacity=1000, path=None, max_bytes=5 * 1024 * 1024, backups=3):
+        self.capacity = max(1, capacity)
+        self.path = Path(path) if path else None
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._reset_locked()
+        self._next_id = 0
+        self._oldest_id = 0
+        # (inode, first line, offset) of the shared file read so far
+        self._tail = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return self._next_id - self._oldest_id
+
+    def _reset_locked(self):
+        self._slots = [None] * self.capacity
+        self._stamps = [0.0] * self.capacity
+        self._indexes = {field: {} for field in self.INDEXED_FIELDS}
+
+    @staticmethod
+    def _index_keys(entry):
+        """Derive index keys from a status entry"""
+        callback = entry.get('callback') or ''
+        dca_id = callback.replace('dca_accept_', '', 1).replace('dca_decline_', '', 1)
+        return {
+            'user_id': str(entry.get('user_id', '')),
+            'dca_id': dca_id,
+            'pair': dca_id.split('_', 1)[0] if dca_id else '',
+            'bot': str(entry.get('bot', '')),
+        }
+
+    @staticmethod
+    def _stamp(entry):
+        try:
+            return datetime.fromisoformat(entry.get('timestamp', '')).timestamp()
+        except (TypeError, ValueError):
+            return 0.0
+
+    def _evict_oldest(self):
+        slot = self._oldest_id % self.capacity
+        entry = self._slots[slot]
+        if entry is not None:
+            for field, key in self._index_keys(entry).items():
+                ids = self._indexes[field].get(key)
+                if ids:
+                    ids.popleft()
+                    if not ids:
+                        del self._indexes[field][key]
+        self._slots[slot] = None
+        self._oldest_id += 1
+
+    def _append_locked(self, entry, stamp, entry_id=None):
+        if entry_id is not None and entry_id > self._next_id:
+            # Ids skipped in between (e.g. cleared elsewhere) stay empty slots
+            if entry_id - self._oldest_id >= self.capacity:
+                # Everything held so far falls out of the window
+                self._reset_locked()
+                self._oldest_id = entry_id
+            self._next_id = entry_id
+        while self._next_id - self._oldest_id >= self.capacity:
+            self._evict_oldest()
+        entry_id = self._next_id
+        entry = {**entry, 'id': entry_id}
+        slot = entry_id % self.capacity
+        self._slots[slot] = entry
+        self._stamps[slot] = stamp
+        for field, key in self._index_keys(entry).items():
+            if key:
+                self._indexes[field].setdefault(key, _IdIndex()).append(entry_id)
+        self._next_id += 1
+        return entry
+
+    def _ingest_locked(self, lines):
+        """Add JSON lines from the shared file in id order, skipping ids already held"""
+        entries = []
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            entry_id = entry.pop('id', None)
+            entries.append((entry_id if isinstance(entry_id, int) else None, entry))
+        # Files written before ids were shared are not strictly in id order
+        entries.sort(key=lambda item: -1 if item[0] is None else item[0])
+        for entry_id, entry in entries:
+            if entry_id is not None and entry_id < self._next_id:
+                continue
+            self._append_locked(entry, self._stamp(entry), entry_id)
+
+    @staticmethod
+    def _complete_lines(data):
+        """Whole lines of `data` and the bytes they span; a line still being written is left"""
+        end = data.rfind(b'\n') + 1
+        return [line for line in data[:end].splitlines() if line.strip()], end
+
+    def _read_from(self, path, offset):
+        """Ingest the complete lines of `path` after `offset`; returns the new offset"""
+        try:
+            with open(path, 'rb') as f:
+                f.seek(offset)
+                lines, consumed = self._complete_lines(f.read())
+        except OSError as e:
+            logger.error(f"Failed to read status log {path}: {e}")
+            return offset
+        self._ingest_locked(lines)
+        return offset + consumed
+
+    def _identity(self, path):
+        """(inode, first line) of a status file, or None if it is missing; every line carries a unique id"""
+        try:
+            with open(path, 'rb') as f:
+                head = f.readline()
+                return os.fstat(f.fileno()).st_ino, head if head.endswith(b'\n') else b''
+        except OSError:
+            return None
+
+    def _changed(self):
+        """Cheap check whether the shared file moved on since the last read"""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return self._tail is not None
+        return self._tail is None or (self._tail[0], self._tail[2]) != (stat.st_ino, stat.st_size)
+
+    def _catch_up_locked(self):
+        """Ingest what was appended to the shared file since the last read; needs the file lock"""
+        if self._tail is None:
+            pending = [(self.path, 0)]
+        else:
+            inode, head, offset = self._tail
+            current = self._identity(self.path)
+            # An inode can be reused after rotation: the first line tells files apart
+            if current is not None and current[0] == inode and (not offset or current[1] == head):
+                pending = [(self.path, offset)]
+            else:
+                # Rotated since: finish the file read last, wherever it moved, then the newer ones
+                backups = [self.path.with_name(f"{self.path.name}.{i}") for i in range(self.backups, 0, -1)]
+                pending = [(backup, 0) for backup in backups]
+                for position, backup in enumerate(backups):
+                    if offset and self._identity(backup) == (inode, head):
+                        pending = [(backup, offset)] + [(newer, 0) for newer in backups[position + 1:]]
+                        break
+                pending.append((self.path, 0))
+        for path, offset in pending:
+            identity = self._identity(path)
+            if identity is None:
+                continue
+            end = self._read_from(path, offset)
+            # Remember the last file read, even a backup, so no later rotation is missed
+            self._tail = (identity[0], identity[1] if end else b'', end)
+
+    @contextmanager
+    def _file_locked(self):
+        """Serialize appends and rotation of the shared file across replicas"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(f"{self.path}.lock", 'a') as lock:
+            if fcntl is not None:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+    def append(self, entry):
+        """Add a status entry, evicting the oldest one when full, and write it to the shared file"""
+        entry = dict(entry)
+        entry.setdefault('timestamp', datetime.now().isoformat())
+        stamp = self._stamp(entry) or time.time()
+        if not self.path:
+            with self._lock:
+                return self._append_locked(entry, stamp)
+        try:
+            with self._file_locked(), self._lock:
+                self._catch_up_locked()
+                entry = self._append_locked(entry, stamp)
+                with open(self.path, 'ab') as f:
+                    f.write((json.dumps(entry, default=str) + '\n').encode())
+                    f.flush()
+                    size = os.fstat(f.fileno()).st_size
+                self._tail = (*self._identity(self.path), size)
+                if size > self.max_bytes:
+                    self._rotate()
+            return entry
+        except OSError as e:
+            logger.error(f"Failed to write status log: {e}")
+            with self._lock:
+                if entry.get('id') is None:
+                    entry = self._append_locked(entry, stamp)
+            return entry
+
+    def clear(self):
+        """Drop all entries; ids keep increasing so old cursors stay valid"""
+        if not self.path:
+            with self._lock:
+                return self._clear_locked()
+        with self._file_locked(), self._lock:
+            self._catch_up_locked()
+            count = self._clear_locked()
+            if self.path.exists():
+                self._rotate()
+        return count
+
+    def _clear_locked(self):
+        count = self._next_id - self._oldest_id
+        self._reset_locked()
+        self._oldest_id = self._next_id
+        return count
+
+    def query(self, user_id=None, dca_id=None, pair=None, bot=None, since=None, cursor=None, limit=10):
+        """
+        Return up to `limit` entries newest-first, optionally filtered.
+        `cursor` is the id of the last entry of the previous page; only older
+        entries are returned. Returns (entries, next_cursor).
+        """
+        filters = {'user_id': user_id, 'dca_id': dca_id, 'pair': pair, 'bot': bot}
+        filters = {field: str(value) for field, value in filters.items() if value not in (None, '')}
+        limit = max(0, limit)
+        results = []
+        with self._lock:
+            upper = self._next_id if cursor is None else min(cursor, self._next_id)
+            if filters:
+                # Walk the most selective index, check the remaining filters per entry
+                candidates = []
+                for field, key in filters.items():
+                    ids = self._indexes[field].get(key)
+                    if not ids:
+                        return [], None
+                    candidates.append(ids)
+                walk = min(candidates, key=len).before(upper)
+            else:
+                walk = iter(range(upper - 1, self._oldest_id - 1, -1))
+
+            for entry_id in walk:
+                if len(results) >= limit:
+                    break
+                slot = entry_id % self.capacity
+                if since is not None and self._stamps[slot] < since:
+                    break
+                entry = self._slots[slot]
+                if entry is None:
+                    continue
+                keys = self._index_keys(entry)
+                if all(keys[field] == key for field, key in filters.items()):
+                    results.append(entry)
+
+        next_cursor = results[-1]['id'] if len(results) == limit and results else None
+        return results, next_cursor
+
+    def _rotate(self):
+        """Shift status log files: current -> .1 -> .2 ..., dropping the oldest"""
+        try:
+            for i in range(self.backups, 0, -1):
+                src = self.path.with_name(f"{self.path.name}.{i - 1}") if i > 1 else self.path
+                dst = self.path.with_name(f"{self.path.name}.{i}")
+                if src.exists():
+                    os.replace(src, dst)
+            if self.backups <= 0 and self.path.exists():
+                self.path.unlink()
+        except Exception as e:
+            logger.error(f"Failed to rotate status log: {e}")
+
+    def load(self):
+        """Restore the most recent entries from the shared file and its backups after a restart"""
+        if not self.path:
+            return 0
+        recent = deque(maxlen=self.capacity)
+        files = [self.path.with_name(f"{self.path.name}.{i}") for i in range(self.backups, 0, -1)]
+        files.append(self.path)
+        with self._file_locked(), self._lock:
+            self._tail = None
+            for path in files:
+                try:
+                    with open(path, 'rb') as f:
+                        lines, consumed = self._complete_lines(f.read())
+                        inode = os.fstat(f.fileno()).st_ino
+                except FileNotFoundError:
+                    continue
+                except OSError as e:
+                    logger.error(f"Failed to read status log {path}: {e}")
+                    continue
+                recent.extend(lines)
+                self._tail = (inode, lines[0] + b'\n' if lines else b'', consumed)
+            self._ingest_locked(recent)
+        return len(recent)
+
+    def reload(self):
+        """
+        Pick up entries other replicas appended to the shared file. Costs a
+        stat when nothing changed, otherwise reads only the new bytes.
+        """
+        if not self.path or not self._changed():
+            return 0
+        with self._file_locked(), self._lock:
+            before = self._next_id
+            self._catch_up_locked()
+            return self._next_id - before
+
+
+class IdempotencyCache:
+    """
+    Bounded LRU memory of processed Telegram updates and DCA decisions.
+
+    `update_id`s that were already handled are skipped outright; a repeated
+    (DCA id, action) pair is answered with the cached result so double taps
+    never reach the confirmation store or the editMessageText API.
+    """
+
+    def __init__(self, capacity=2048):
+        self.capacity = max(1, capacity)
+        self._update_ids = OrderedDict()
+        self._decisions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _remember(self, store, key, value):
+        store[key] = value
+        store.move_to_end(key)
+        while len(store) > self.capacity:
+            store.popitem(last=False)
+
+    def seen_update(self, update_id):
+        """Return True if update_id was handled before, otherwise record it"""
+        with self._lock:
+            if update_id in self._update_ids:
+                self._update_ids.move_to_end(update_id)
+                return True
+            self._remember(self._update_ids, update_id, True)
+            return False
+
+    def get_decision(self, dca_id, action):
+        """Return the cached result for (dca_id, action), or None"""
+        with self._lock:
+            result = self._decisions.get((dca_id, action))
+            if result is not None:
+                self._decisions.move_to_end((dca_id, action))
+            return result
+
+    def put_decision(self, dca_id, action, result):
+        with self._lock:
+            self._remember(self._decisions, (dca_id, action), result)
+
+
+class LeaderLease:
+    """
+    Time-bounded leadership shared by webhook replicas through a lease file.
+
+    The file holds {holder, expires_at}. It is only read and rewritten while
+    holding an exclusive flock on a sidecar lock file, so taking and renewing
+    the lease are atomic across processes. The holder renews every ttl/3; a
+    replica that stops renewing (crash, freeze, lost volume) loses the lease
+    after ttl and the next stand-by attempt takes it over. A holder stops
+    acting a quarter ttl before its own expiry, so two replicas never both
+    believe they lead.
+    """
+
+    def __init__(self, path, ttl=10.0, holder=REPLICA_ID):
+        self.path = Path(path)
+        self.ttl = max(1.0, ttl)
+        self.holder = holder
+        self._expires_at = 0.0
+
+    def _locked(self, update):
+        """Run update(lease dict) under the lease lock; persist the dict it returns"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(f"{self.path}.lock", 'a') as lock:
+            if fcntl is not None:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            try:
+                lease = self.read()
+                new_lease = update(lease)
+                if new_lease is not None:
+                    tmp_path = f"{self.path}.tmp"
+                    with open(tmp_path, 'w') as f:
+                        json.dump(new_lease, f)
+                    os.replace(tmp_path, self.path)
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+    def read(self):
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def try_acquire(self):
+        """Take or renew the lease if it is free, expired or already ours"""
+        def update(lease):
+            now = time.time()
+            if lease.get('holder') not in (None, self.holder) and lease.get('expires_at', 0) > now:
+                self._expires_at = 0.0
+                return None
+            self._expires_at = now + self.ttl
+            return {'holder': self.holder, 'expires_at': self._expires_at, 'renewed_at': now}
+
+        try:
+            self._locked(update)
+        except Exception as e:
+            logger.error(f"Lease renewal failed: {e}")
+            # Keep the remaining lease time; is_leader() runs out on its own
+        return self.is_leader()
+
+    def release(self):
+        """Give the lease up so a stand-by takes over without waiting for expiry"""
+        def update(lease):
+            self._expires_at = 0.0
+            return {**lease, 'expires_at': 0} if lease.get('holder') == self.holder else None
+
+        try:
+            self._locked(update)
+        except Exception as e:
+            logger.error(f"Lease release failed: {e}")
+
+    def is_leader(self):
+        return fcntl is None or time.time() < self._expires_at - self.ttl / 4
+
+
+class BotRoute:
+    """Where one freqtrade bot keeps its confirmation store, decision socket, trace log and snapshot"""
+
+    def __init__(self, name, data_dir, decision_socket=None, trace_file=None, snapshot_file=None):
+        self.name = name
+        self.data_dir = data_dir
+        self.decision_socket = decision_socket or os.path.join(data_dir, 'dca_decisions.sock')
+        self.trace_file = trace_file if trace_file is not None else os.path.join(data_dir, 'dca_trace.jsonl')
+        self.snapshot = SnapshotReader(snapshot_file or os.path.join(data_dir, 'indicator_snapshot.bin'))
+
+
+def parse_bots(spec):
+    """Build the bot routes from DCA_BOTS, or the single default bot when unset"""
+    if not spec.strip():
+        return {DEFAULT_BOT: BotRoute(DEFAULT_BOT, DATA_DIR, DECISION_SOCKET, DCA_TRACE_FILE, SNAPSHOT_FILE)}
+    routes = {}
+    for item in spec.split(','):
+        name, _, data_dir = item.strip().partition('=')
+        if not name or not data_dir or '|' in name:
+            raise ValueError(f"Invalid DCA_BOTS entry {item!r}, expected name=data_dir")
+        routes[name] = BotRoute(name, data_dir)
+    return routes
+
+
+def resolve_bot(dca_id):
+    """Split a callback DCA id into (bot route or None if unknown, bot-local DCA id)"""
+    name, separator, local_id = dca_id.partition('|')
+    if not separator:
+        return next(iter(bots.values())), dca_id
+    return bots.get(name), local_id
+
+
+def split_callback_data(callback_data):
+    """Split 'dca_accept_<id>' / 'dca_decline_<id>' into (dca_id, action)"""
+    for action in ('accept', 'decline'):
+        prefix = f'dca_{action}_'
+        if callback_data.startswith(prefix):
+            return callback_data[len(prefix):], action
+    return callback_data, None
+
+
+def trace_span(route, dca_id, stage, **fields):
+    """Append a timestamped DCA stage span to the bot's trace log with a single O_APPEND write"""
+    if not route.trace_file:
+        return
+    span = {'ts': time.time(), 'dca_id': dca_id, 'stage': stage, 'source': 'webhook', **fields}
+    try:
+        fd = os.open(route.trace_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, (json.dumps(span, default=str) + '\n').encode())
+        finally:
+            os.close(fd)
+    except OSError as e:
+        logger.debug(f"Failed to write DCA trace span: {e}")
+
+
+def notify_strategy(route, dca_id, action):
+    """Push a decision to the bot's decision socket; best effort"""
+    if not hasattr(socket, 'AF_UNIX') or not os.path.exists(route.decision_socket):
+        return False
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(1)
+            sock.connect(route.decision_socket)
+            sock.sendall((json.dumps({'dca_id': dca_id, 'action': action}) + '\n').encode())
+            return sock.recv(16).startswith(b'ok')
+    except OSError as e:
+        logger.warning(f"Strategy decision push failed for {dca_id}, file fallback applies: {e}")
+        return False
+
+
+def load_update_offset():
+    """Load the last processed getUpdates update_id"""
+    try:
+        with open(UPDATE_OFFSET_FILE, 'r') as f:
+            return int(json.load(f).get('last_update_id', 0))
+    except FileNotFoundError:
+        return 0
+    except Exception as e:
+        logger.error(f"Failed to load update offset: {e}")
+        return 0
+
+
+def save_update_offset(update_id):
+    """Atomically persist the last processed getUpdates update_id"""
+    tmp_path = f"{UPDATE_OFFSET_FILE}.tmp"
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump({'last_update_id': update_id, 'saved_at': datetime.now().isoformat()}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, UPDATE_OFFSET_FILE)
+    except Exception as e:
+        logger.error(f"Failed to save update offset: {e}")
+
+
+# Store last status for monitoring
+status_log = StatusLog(
+    capacity=STATUS_LOG_CAPACITY,
+    path=STATUS_LOG_FILE,
+    max_bytes=STATUS_LOG_MAX_BYTES,
+    backups=STATUS_LOG_BACKUPS,
+)
+
+idempotency_cache = IdempotencyCache(IDEMPOTENCY_CACHE_SIZE)
+bots = parse_bots(DCA_BOTS)
+leader_lease = LeaderLease(LEASE_FILE, LEASE_TTL)
+dca_metrics.registry.gauge(
+    "dca_webhook_leader", "1 while this replica holds the leader lease",
+    callback=lambda: 1.0 if leader_lease.is_leader() else 0.0,
+)
+
+
+
+def telegram_post(url, payload, timeout):
+    """POST to a Telegram Bot API method URL, recording per-method latency"""
+    method = url.rsplit('/', 1)[-1]
+    start = time.perf_counter()
+    try:
+        return requests.post(url, json=payload, timeout=timeout)
+    finally:
+        dca_metrics.telegram_request_seconds.observe(time.perf_counter() - start, method=method)
+
 
 def show_loading_toast(callback_query_id, bot_token):
     """Show loading indicator toast to user"""
@@ -42,11 +694,134 @@ def show_loading_toast(callback_query_id, bot_token):
             "text": "⏳ Processing your confirmation...",
             "show_alert": False
         }
-        requests.post(url, json=payload, timeout=5)
+        telegram_post(url, payload, timeout=5)
     except Exception as e:
         logger.error(f"Error showing loading toast: {e}")
 
 
+def parse_authorized_users(spec):
+    """User ids from a JSON list ('["1","2"]') or a comma separated string"""
+    spec = spec.strip()
+    if not spec:
+        return set()
+    try:
+        ids = json.loads(spec) if spec.startswith('[') else spec.split(',')
+    except ValueError:
+        ids = spec.strip('[]').split(',')
+    return {str(user_id).strip().strip('"\'') for user_id in ids if str(user_id).strip()}
+
+
+authorized_users = parse_authorized_users(AUTHORIZED_USERS)
+
+
+def is_authorized(callback):
+    """Clicks count only from authorized users, or from the configured chat if none are listed"""
+    user_id = str(callback.get('from', {}).get('id', ''))
+    if authorized_users:
+        return user_id in authorized_users
+    chat_id = str(callback.get('message', {}).get('chat', {}).get('id', ''))
+    return bool(TELEGRAM_CHAT_ID) and TELEGRAM_CHAT_ID in (user_id, chat_id)
+
+
+def has_valid_secret():
+    """The request carries TELEGRAM_WEBHOOK_SECRET; without a configured secret nothing does"""
+    token = request.headers.get('X-Telegram-Bot-Api-Secret-Token', '')
+    return bool(TELEGRAM_WEBHOOK_SECRET) and hmac.compare_digest(token, TELEGRAM_WEBHOOK_SECRET)
+
+
+def record_callback_outcome(result, bot):
+    """Count a processed callback as accepted, declined or failed"""
+    if result.get('success'):
+        outcome = 'accepted' if result.get('action') == 'accept' else 'declined'
+    else:
+        outcome = 'failed'
+    dca_metrics.callbacks_total.inc(outcome=outcome, bot=bot)
+
+
+def decide_callback(route, dca_id, action, user_id):
+    """Record a decision in the bot's store and push it to the bot; returns the handler result"""
+    # Callback queries carry no click time; this is when the click reached us
+    trace_span(route, dca_id, 'clicked', action=action, user_id=user_id)
+    result = handle_dca_callback(f"dca_{action}_{dca_id}", user_id, route.data_dir, bot=route.name)
+    if result.get('duplicate'):
+        # Already in the store, e.g. recorded by another replica before a failover
+        dca_metrics.callbacks_total.inc(outcome='duplicate', bot=route.name)
+        return result
+    record_callback_outcome(result, route.name)
+    if result.get('success'):
+        trace_span(route, dca_id, 'decided', action=action)
+        notify_strategy(route, dca_id, action)
+    return result
+
+
+def process_update(update, bot_token):
+    """Handle a single Telegram Update (from getUpdates or a webhook push)"""
+    if 'callback_query' not in update:
+        return
+    if idempotency_cache.seen_update(update.get('update_id')):
+        logger.info(f"Skipping already processed update {update.get('update_id')}")
+        return
+    
+    callback = update['callback_query']
+    user_id = callback['from']['id']
+    callback_data = callback.get('data', '')
+    callback_query_id = callback['id']
+    message = callback.get('message', {})
+    message_id = message.get('message_id')
+    chat_id = message.get('chat', {}).get('id')
+    
+    # Only process DCA callbacks
+    if 'dca_' not in callback_data:
+        return
+    
+    logger.info(f"🎯 CALLBACK DETECTED: {callback_data} from user {user_id}")
+    namespaced_id, action = split_callback_data(callback_data)
+    route, dca_id = resolve_bot(namespaced_id)
+    if route is None:
+        logger.warning(f"Callback {callback_data} names an unknown bot, ignoring")
+        dca_metrics.callbacks_total.inc(outcome='unknown_bot', bot=namespaced_id.partition('|')[0])
+        return
+    dca_metrics.callbacks_total.inc(outcome='received', bot=route.name)
+    if not is_authorized(callback):
+        logger.warning(f"Ignoring {callback_data} from unauthorized user {user_id}")
+        dca_metrics.callbacks_total.inc(outcome='unauthorized', bot=route.name)
+        return
+    
+    # Show loading toast
+    show_loading_toast(callback_query_id, bot_token)
+    
+    # Repeated taps on the same button are answered from memory
+    if idempotency_cache.get_decision(namespaced_id, action) is not None:
+        logger.info(f"Duplicate {action} for {namespaced_id} from user {user_id}, already recorded")
+        dca_metrics.callbacks_total.inc(outcome='duplicate', bot=route.name)
+        return
+    
+    # Process callback
+    result_status = decide_callback(route, dca_id, action, user_id)
+    if result_status.get('success'):
+        idempotency_cache.put_decision(namespaced_id, action, result_status)
+    
+    # Update message with result
+    if message_id and chat_id:
+        update_message_with_result(
+            bot_token,
+            chat_id,
+            message_id,
+            result_status,
+            f"dca_{action}_{dca_id}",
+            route
+        )
+    
+    # Log status
+    status_log.append({
+        'timestamp': datetime.now().isoformat(),
+        'bot': route.name,
+        'user_id': user_id,
+        'callback': f"dca_{action}_{dca_id}",
+        'result': result_status
+    })
+
+
 def poll_telegram_updates():
     """Poll Telegram for callback_query updates"""
     global last_update_id, polling_active
@@ -57,9 +832,11 @@ def poll_telegram_updates():
         return
     
     polling_active = True
-    logger.info("Starting Telegram polling for callback updates...")
+    # A previous leader may have advanced the shared offset
+    last_update_id = max(last_update_id, load_update_offset())
+    logger.info(f"Starting Telegram polling for callback updates (offset {last_update_id + 1})...")
     
-    while polling_active:
+    while polling_active and leader_lease.is_leader():
         try:
             url = f"https://api.telegram.org/bot{bot_token}/getUpdates"
             payload = {
@@ -68,54 +845,23 @@ def poll_telegram_updates():
                 "timeout": 30
             }
             
-            response = requests.post(url, json=payload, timeout=45)
+            start = time.perf_counter()
+            response = telegram_post(url, payload, timeout=45)
+            dca_metrics.getupdates_seconds.observe(time.perf_counter() - start)
             result = response.json()
             
             if result.get('ok'):
                 updates = result.get('result', [])
+                dca_metrics.getupdates_batch_size.observe(len(updates))
                 
                 for update in updates:
+                    # Unprocessed updates stay unconfirmed for the next leader
+                    if not leader_lease.is_leader():
+                        break
                     last_update_id = update['update_id']
-                    
-                    if 'callback_query' in update:
-                        callback = update['callback_query']
-                        user_id = callback['from']['id']
-                        callback_data = callback.get('data', '')
-                        callback_query_id = callback['id']
-                        message = callback.get('message', {})
-                        message_id = message.get('message_id')
-                        chat_id = message.get('chat', {}).get('id')
-                        
-                        # Only process DCA callbacks
-                        if 'dca_' in callback_data:
-                            logger.info(f"🎯 CALLBACK DETECTED: {callback_data} from user {user_id}")
-                            
-                            # Show loading toast
-                            show_loading_toast(callback_query_id, bot_token)
-                            
-                            # Process callback
-                            result_status = handle_dca_callback(callback_data, user_id, DATA_DIR)
-                            
-                            # Update message with result
-                            if message_id and chat_id:
-                                update_message_with_result(
-                                    bot_token,
-                                    chat_id,
-                                    message_id,
-                                    result_status,
-                                    callback_data
-                                )
-                            
-                            # Log status
-                            status_log.append({
-                                'timestamp': datetime.now().isoformat(),
-                                'user_id': user_id,
-                                'callback': callback_data,
-                                'result': result_status
-                            })
-                            
-                            if len(status_log) > 1000:
-                                status_log.pop(0)
+                    process_update(update, bot_token)
+                    # Per update, so a takeover repeats at most the one in flight
+                    save_update_offset(last_update_id)
             else:
                 logger.error(f"Telegram API error: {result}")
         
@@ -123,6 +869,7 @@ def poll_telegram_updates():
             logger.error(f"Polling error: {e}")
             time.sleep(5)
     
+    polling_active = False
     logger.info("Polling stopped")
 
 
@@ -133,7 +880,96 @@ def start_polling_thread():
     return thread
 
 
-def update_message_with_result(bot_token, chat_id, message_id, result, callback_data):
+def run_leader_election():
+    """Renew or contend for the polling lease; poll only while it is held"""
+    poller = None
+    was_leader = False
+    while True:
+        leader = leader_lease.try_acquire()
+        if leader and not was_leader:
+            logger.info(f"👑 Replica {REPLICA_ID} holds the polling lease")
+        elif was_leader and not leader:
+            logger.warning(f"Replica {REPLICA_ID} lost the polling lease, standing by")
+        was_leader = leader
+        polling = TELEGRAM_UPDATE_MODE != 'webhook'
+        if leader and polling and (poller is None or not poller.is_alive()):
+            poller = start_polling_thread()
+        time.sleep(leader_lease.ttl / 3)
+
+
+def start_leader_election_thread():
+    """Start leader election (and, while leading in polling mode, polling) in background thread"""
+    thread = threading.Thread(target=run_leader_election, daemon=True)
+    thread.start()
+    return thread
+
+
+def process_pushed_updates():
+    """Worker for push mode: drain updates acknowledged by /telegram/update"""
+    bot_token = os.getenv('TELEGRAM_BOT_TOKEN')
+    logger.info("Starting Telegram push update worker...")
+    
+    while True:
+        update = update_queue.get()
+        try:
+            process_update(update, bot_token)
+        except Exception as e:
+            logger.error(f"Error processing pushed update: {e}")
+        finally:
+            update_queue.task_done()
+
+
+def start_push_worker_thread():
+    """Start push update worker in background thread"""
+    thread = threading.Thread(target=process_pushed_updates, daemon=True)
+    thread.start()
+    return thread
+
+
+def configure_telegram_webhook(bot_token):
+    """Register (push mode) or remove (polling mode) the Telegram webhook"""
+    try:
+        if TELEGRAM_UPDATE_MODE == 'webhook':
+            url = f"https://api.telegram.org/bot{bot_token}/setWebhook"
+            payload = {
+                "url": TELEGRAM_WEBHOOK_URL.rstrip('/') + '/telegram/update',
+                "allowed_updates": ["callback_query"],
+                "secret_token": TELEGRAM_WEBHOOK_SECRET,
+            }
+        else:
+            # getUpdates is rejected while a webhook is registered
+            url = f"https://api.telegram.org/bot{bot_token}/deleteWebhook"
+            payload = {}
+        
+        result = telegram_post(url, payload, timeout=10).json()
+        if not result.get('ok'):
+            logger.error(f"Telegram webhook configuration failed: {result}")
+            return False
+        return True
+    except Exception as e:
+        logger.error(f"Error configuring Telegram webhook: {e}")
+        return False
+
+
+def market_context(order_id, route):
+    """Current price/RSI/DI line for the DCA's pair from the bot's snapshot, or ''"""
+    # DCA ids are "<pair>_<open date>_<order number>"
+    pair = order_id.rsplit('_', 2)[0]
+    try:
+        latest = route.snapshot.get(pair)
+    except Exception as e:
+        logger.warning(f"Could not read indicator snapshot: {e}")
+        return ""
+    if not latest:
+        return ""
+    candle = datetime.fromtimestamp(latest['date']).strftime('%H:%M')
+    return (
+        f"📈 Now ({candle} candle): {latest['close']:.6g} | "
+        f"RSI {latest['rsi']:.1f} | DI {latest['DI_values']:+.1f}\n"
+    )
+
+
+def update_message_with_result(bot_token, chat_id, message_id, result, callback_data, route):
     """Update message with final result"""
     try:
         action = "accept" if "accept" in callback_data else "decline"
@@ -149,7 +985,7 @@ Order ID: {order_id}
 
 ✅ Status: Will execute at next candle
 ⏰ Time: {datetime.now().strftime('%H:%M:%S')}
-
+{market_context(order_id, route)}
 🚀 Your DCA entry is queued for execution
 """
         else:
@@ -162,7 +998,7 @@ Order ID: {order_id}
 
 🚫 Status: This DCA has been skipped
 ⏰ Time: {datetime.now().strftime('%H:%M:%S')}
-⏱️ Retry: Available in 30 minutes
+{market_context(order_id, route)}⏱️ Retry: Available in 30 minutes
 """
         
         url = f"https://api.telegram.org/bot{bot_token}/editMessageText"
@@ -172,7 +1008,7 @@ Order ID: {order_id}
             "text": new_text,
             "parse_mode": "Markdown"
         }
-        requests.post(url, json=payload, timeout=5)
+        telegram_post(url, payload, timeout=5)
         logger.info(f"Message updated for {order_id}")
     except Exception as e:
         logger.error(f"Error updating message: {e}")
@@ -181,14 +1017,21 @@ Order ID: {order_id}
 @app.route('/dca_button_callback', methods=['POST'])
 def dca_button_callback():
     """
-    Handle DCA button callbacks from Telegram with loading indicator
+    Handle DCA button callbacks relayed over HTTP, with loading indicator.
+    Requires the X-Telegram-Bot-Api-Secret-Token header (TELEGRAM_WEBHOOK_SECRET)
+    and an authorized user_id, since accepted decisions are executed by the bot.
     Expected JSON: {
         "user_id": 123456, 
-        "callback_data": "dca_accept_PAIR_TIMESTAMP_NUMBER",
+        "callback_data": "dca_accept_[BOT|]PAIR_TIMESTAMP_NUMBER",
         "callback_query_id": "telegram_query_id",
-        "message_id": 123
+        "message_id": 123,
+        "bot": "optional bot name, if callback_data is not namespaced"
     }
     """
+    # Accepted decisions place orders: same shared secret as /telegram/update
+    if not has_valid_secret():
+        return jsonify({'error': 'Forbidden'}), 403
+    
     try:
         data = request.get_json()
         user_id = data.get('user_id')
@@ -201,13 +1044,33 @@ def dca_button_callback():
             return jsonify({'error': 'Missing required fields'}), 400
         
         logger.info(f"Received callback: {callback_data} from user {user_id}")
+        if not is_authorized({'from': {'id': user_id}, 'message': {'chat': {'id': chat_id or ''}}}):
+            logger.warning(f"Ignoring {callback_data} from unauthorized user {user_id}")
+            dca_metrics.callbacks_total.inc(outcome='unauthorized', bot=data.get('bot') or 'unknown')
+            return jsonify({'error': 'Unauthorized user'}), 403
+        namespaced_id, action = split_callback_data(callback_data)
+        if data.get('bot') and '|' not in namespaced_id:
+            namespaced_id = f"{data['bot']}|{namespaced_id}"
+        route, dca_id = resolve_bot(namespaced_id)
+        if route is None:
+            dca_metrics.callbacks_total.inc(outcome='unknown_bot', bot=namespaced_id.partition('|')[0])
+            return jsonify({'error': 'Unknown bot'}), 404
+        dca_metrics.callbacks_total.inc(outcome='received', bot=route.name)
         
         # Show loading toast to user
         if callback_query_id:
             show_loading_toast(callback_query_id, os.getenv('TELEGRAM_BOT_TOKEN'))
         
+        # Repeated taps on the same button are answered from memory
+        cached = idempotency_cache.get_decision(namespaced_id, action)
+        if cached is not None:
+            dca_metrics.callbacks_total.inc(outcome='duplicate', bot=route.name)
+            return jsonify(cached), 200
+        
         # Process callback
-        result = handle_dca_callback(callback_data, user_id, DATA_DIR)
+        result = decide_callback(route, dca_id, action, user_id)
+        if result.get('success'):
+            idempotency_cache.put_decision(namespaced_id, action, result)
         
         # Update message with result if we have message_id and chat_id
         if message_id and chat_id:
@@ -216,21 +1079,19 @@ def dca_button_callback():
                 chat_id,
                 message_id,
                 result,
-                callback_data
+                f"dca_{action}_{dca_id}",
+                route
             )
         
         # Log status
         status_log.append({
             'timestamp': datetime.now().isoformat(),
+            'bot': route.name,
             'user_id': user_id,
-            'callback': callback_data,
+            'callback': f"dca_{action}_{dca_id}",
             'result': result
         })
         
-        # Keep only last 1000 entries
-        if len(status_log) > 1000:
-            status_log.pop(0)
-        
         return jsonify(result), 200
     
     except Exception as e:
@@ -238,28 +1099,82 @@ def dca_button_callback():
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/telegram/update', methods=['POST'])
+def telegram_update():
+    """
+    Receive raw Telegram Update payloads pushed via setWebhook.
+    Acknowledges immediately; processing happens on the push worker thread.
+    """
+    if TELEGRAM_UPDATE_MODE != 'webhook':
+        return jsonify({'error': 'Push mode disabled'}), 404
+    
+    # Without a secret anyone could post forged clicks: never accept unauthenticated pushes
+    if not has_valid_secret():
+        return jsonify({'error': 'Forbidden'}), 403
+    
+    update = request.get_json(silent=True)
+    if not isinstance(update, dict) or 'update_id' not in update:
+        return jsonify({'error': 'Invalid update'}), 400
+    
+    update_queue.put(update)
+    return jsonify({'ok': True}), 200
+
+
 @app.route('/health', methods=['GET'])
 def health():
-    """Health check endpoint"""
-    return jsonify({'status': 'ok', 'timestamp': datetime.now().isoformat()}), 200
+    """Health check endpoint; every replica is healthy, only the leader polls"""
+    lease = leader_lease.read()
+    return jsonify({
+        'status': 'ok',
+        'bots': list(bots),
+        'replica': REPLICA_ID,
+        'role': 'leader' if leader_lease.is_leader() else 'standby',
+        'lease_holder': lease.get('holder'),
+        'lease_expires_at': lease.get('expires_at'),
+        'timestamp': datetime.now().isoformat()
+    }), 200
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus text-format metrics"""
+    return dca_metrics.registry.render(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
 
 
 @app.route('/status', methods=['GET'])
 def status():
-    """Get recent callback status"""
+    """
+    Get recent callback status
+    Query params: limit, bot, user_id, dca_id, pair, since (ISO or epoch seconds),
+    cursor (`next_cursor` of the previous page, returns older entries)
+    """
     limit = request.args.get('limit', 10, type=int)
+    # Entries other replicas appended since the last request (a stat if none)
+    status_log.reload()
+    try:
+        since = _parse_since(request.args.get('since'))
+    except ValueError:
+        return jsonify({'error': 'Invalid since value'}), 400
+    entries, next_cursor = status_log.query(
+        user_id=request.args.get('user_id'),
+        dca_id=request.args.get('dca_id'),
+        pair=request.args.get('pair'),
+        bot=request.args.get('bot'),
+        since=since,
+        cursor=request.args.get('cursor', type=int),
+        limit=limit,
+    )
     return jsonify({
         'total_callbacks': len(status_log),
-        'recent': status_log[-limit:] if status_log else []
+        'recent': list(reversed(entries)),
+        'next_cursor': next_cursor
     }), 200
 
 
 @app.route('/clear_logs', methods=['POST'])
 def clear_logs():
     """Clear status logs"""
-    global status_log
-    count = len(status_log)
-    status_log = []
+    count = status_log.clear()
     return jsonify({'message': f'Cleared {count} log entries'}), 200
 
 
@@ -267,11 +1182,34 @@ if __name__ == '__main__':
     port = int(os.getenv('WEBHOOK_PORT', '5555'))
     host = os.getenv('WEBHOOK_HOST', '0.0.0.0')
     logger.info(f"Starting DCA Webhook Server on {host}:{port}")
-    logger.info(f"Data directory: {DATA_DIR}")
+    for route in bots.values():
+        logger.info(f"Serving bot '{route.name}' from {route.data_dir}")
+    
+    # Restore status history; new entries are written through to the shared file
+    restored = status_log.load()
+    logger.info(f"Restored {restored} status log entries from {STATUS_LOG_FILE}")
+    
+    if TELEGRAM_UPDATE_MODE == 'webhook' and not TELEGRAM_WEBHOOK_SECRET:
+        logger.error("TELEGRAM_UPDATE_MODE=webhook requires TELEGRAM_WEBHOOK_SECRET; refusing to start")
+        sys.exit(1)
+    if not authorized_users and not TELEGRAM_CHAT_ID:
+        logger.warning("Neither AUTHORIZED_USERS nor TELEGRAM_CHAT_ID set; every DCA click will be ignored")
+    
+    bot_token = os.getenv('TELEGRAM_BOT_TOKEN')
+    if bot_token:
+        configure_telegram_webhook(bot_token)
+    
+    if TELEGRAM_UPDATE_MODE == 'webhook':
+        if not TELEGRAM_WEBHOOK_URL:
+            logger.error("TELEGRAM_UPDATE_MODE=webhook requires TELEGRAM_WEBHOOK_URL")
+        logger.info("📨 Push mode: receiving Telegram updates on /telegram/update")
+        start_push_worker_thread()
+    else:
+        logger.info("🔔 Telegram polling runs on the replica holding the lease...")
     
-    # Start polling thread
-    logger.info("🔔 Starting Telegram polling thread for callbacks...")
-    start_polling_thread()
+    # The leader polls Telegram (polling mode)
+    logger.info(f"Replica {REPLICA_ID} contending for the leader lease {LEASE_FILE}")
+    start_leader_election_thread()
     
     # Start Flask app
     app.run(host=host, port=port, debug=False, threaded=True)
@@ -8,12 +8,27 @@ Watches for:
 4. Order confirmation status updates
 """
 
+import argparse
+import http.client
 import subprocess
 import json
+import os
+import re
+import shutil
+import socket
+import sys
 import time
+import unicodedata
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime
 from pathlib import Path
 import threading
+from urllib.parse import urlsplit
+
+# Snapshot reader is shared with the webhook (scripts/ mirrors docker/)
+sys.path.insert(0, str(Path(__file__).resolve().parent / 'scripts'))
+from dca_snapshot import SnapshotReader  # noqa: E402
 
 # Color codes
 GREEN = '\033[92m'
@@ -23,45 +38,179 @@ RED = '\033[91m'
 RESET = '\033[0m'
 BRIGHT = '\033[1m'
 
-# State tracking
-last_freqtrade_log = 0
-last_webhook_log = 0
-last_confirmations_mod = 0
-monitored_orders = {}
+# Log sources: the freqtrade log file is followed directly when present,
+# otherwise the container output is streamed with `docker logs -f`
+FREQTRADE_CONTAINER = os.getenv('FREQTRADE_CONTAINER', 'freqtrade-dca')
+WEBHOOK_CONTAINER = os.getenv('WEBHOOK_CONTAINER', 'dca-webhook')
+FREQTRADE_LOG_FILE = os.getenv('FREQTRADE_LOG_FILE', '/freqtrade/user_data/logs/freqtrade.log')
+EVENT_BUFFER_SIZE = int(os.getenv('MONITOR_EVENT_BUFFER', '2000'))
+CONFIRMATIONS_FILE = os.getenv('DCA_CONFIRMATIONS_PATH', '/root/dca-config/user_data/dca_confirmations.json')
+SNAPSHOT_FILE = os.getenv('DCA_SNAPSHOT_FILE', '/root/dca-config/user_data/indicator_snapshot.bin')
 
+Event = namedtuple('Event', ['seq', 'time', 'source', 'kind', 'text'])
 
-def get_freqtrade_logs():
-    """Get recent Freqtrade logs"""
-    try:
-        result = subprocess.run(
-            ['docker', 'logs', 'freqtrade-dca', '--tail=50'],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        return result.stdout
-    except:
-        return ""
+LOG_TIMESTAMP = re.compile(r'^(\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2})')
 
 
-def get_webhook_logs():
-    """Get recent webhook logs"""
-    try:
-        result = subprocess.run(
-            ['docker', 'logs', 'dca-webhook', '--tail=30'],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        return result.stdout
-    except:
-        return ""
+def classify_freqtrade_line(line):
+    """Map a freqtrade log line to a dashboard panel (or None to drop it)"""
+    if 'DEBUG' in line:
+        return None
+    lower = line.lower()
+    if 'telegram' in lower or 'sendmessage' in lower or 'sent' in lower:
+        return 'telegram'
+    if any(keyword in line for keyword in ['DCA', 'adjust_trade', 'trade', 'Sold', 'Bought']):
+        return 'freqtrade'
+    return None
+
+
+def classify_webhook_line(line):
+    """Map a webhook log line to a dashboard panel (or None to drop it)"""
+    if 'CALLBACK' in line or 'accepted' in line or 'declined' in line:
+        if 'INFO' in line or '🎯' in line:
+            return 'callback'
+    return None
+
+
+class EventBuffer:
+    """Shared bounded buffer of parsed log events, fed by the followers"""
+
+    def __init__(self, size=2000):
+        self._events = deque(maxlen=size)
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    def add(self, source, kind, text):
+        match = LOG_TIMESTAMP.match(text)
+        stamp = match.group(1).replace('T', ' ') if match else datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        with self._lock:
+            self._seq += 1
+            self._events.append(Event(self._seq, stamp, source, kind, text))
+
+    @property
+    def seq(self):
+        with self._lock:
+            return self._seq
+
+    def latest(self, kind, limit=10):
+        """Return the newest `limit` events of one kind, oldest first"""
+        with self._lock:
+            matched = []
+            for event in reversed(self._events):
+                if event.kind == kind:
+                    matched.append(event)
+                    if len(matched) >= limit:
+                        break
+        return list(reversed(matched))
+
+
+class LogFollower(threading.Thread):
+    """
+    Long-lived follower for one log source. Tails a file by byte offset
+    (surviving rotation/truncation) or streams `docker logs -f` for a
+    container, parses each line once and pushes events into the buffer.
+    """
+
+    def __init__(self, source, classify, events, path=None, container=None, backlog=50):
+        super().__init__(daemon=True, name=f'follow-{source}')
+        self.source = source
+        self.classify = classify
+        self.events = events
+        self.path = Path(path) if path else None
+        self.container = container
+        self.backlog = backlog
+
+    def _emit(self, line):
+        line = line.rstrip('\r\n')
+        kind = self.classify(line)
+        if kind:
+            self.events.add(self.source, kind, line)
+
+    def _read_complete_lines(self, handle):
+        """Emit every complete line after the current offset, keep partial lines for later"""
+        while True:
+            offset = handle.tell()
+            line = handle.readline()
+            if not line.endswith(b'\n'):
+                # Partial line: rewind and wait for the writer to finish it
+                handle.seek(offset)
+                return
+            self._emit(line.decode(errors='replace'))
+
+    def _follow_file(self):
+        handle = None
+        inode = None
+        while True:
+            try:
+                stat = self.path.stat()
+            except OSError:
+                time.sleep(1)
+                continue
+            if handle is None or stat.st_ino != inode or stat.st_size < handle.tell():
+                # First open, rotated or truncated: (re)open the current file
+                if handle:
+                    if stat.st_ino != inode:
+                        self._read_complete_lines(handle)
+                    handle.close()
+                handle = open(self.path, 'rb')
+                if inode is None:
+                    # Start near the end so only recent history is replayed
+                    handle.seek(max(0, stat.st_size - 200 * self.backlog))
+                    if handle.tell():
+                        handle.readline()
+                inode = stat.st_ino
+            self._read_complete_lines(handle)
+            time.sleep(0.5)
+
+    def _follow_container(self):
+        tail = self.backlog
+        while True:
+            try:
+                # Container logs go to stderr as well, merge both streams
+                process = subprocess.Popen(
+                    ['docker', 'logs', '-f', f'--tail={tail}', self.container],
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.STDOUT,
+                    text=True,
+                    errors='replace'
+                )
+                for line in process.stdout:
+                    self._emit(line)
+                process.wait()
+            except Exception:
+                pass
+            # Container restarted or docker unavailable: resume without replaying
+            tail = 0
+            time.sleep(2)
+
+    def run(self):
+        if self.path:
+            self._follow_file()
+        else:
+            self._follow_container()
+
+
+events = EventBuffer(EVENT_BUFFER_SIZE)
+followers = []
+
+
+def start_followers():
+    """Start one follower per log source (once)"""
+    if followers:
+        return
+    if Path(FREQTRADE_LOG_FILE).exists():
+        followers.append(LogFollower('freqtrade', classify_freqtrade_line, events, path=FREQTRADE_LOG_FILE))
+    else:
+        followers.append(LogFollower('freqtrade', classify_freqtrade_line, events, container=FREQTRADE_CONTAINER))
+    followers.append(LogFollower('webhook', classify_webhook_line, events, container=WEBHOOK_CONTAINER, backlog=30))
+    for follower in followers:
+        follower.start()
 
 
 def load_confirmations():
     """Load current confirmations from JSON"""
     try:
-        path = Path('/root/dca-config/user_data/dca_confirmations.json')
+        path = Path(CONFIRMATIONS_FILE)
         if path.exists():
             with open(path, 'r') as f:
                 return json.load(f)
@@ -70,134 +219,436 @@ def load_confirmations():
     return {}
 
 
+def freqtrade_panel():
+    """Freqtrade DCA trigger lines"""
+    recent = events.latest('freqtrade', limit=20)
+    if not recent:
+        return []
+    return ['', f"{GREEN}📊 FREQTRADE DCA ACTIVITY DETECTED{RESET}"] + [f"  {e.text[:120]}" for e in recent]
+
+
+def telegram_panel():
+    """Telegram message lines"""
+    recent = events.latest('telegram', limit=10)
+    if not recent:
+        return []
+    return ['', f"{BLUE}💬 TELEGRAM MESSAGE ACTIVITY{RESET}"] + [f"  {e.text[:120]}" for e in recent]
+
+
+def webhook_panel():
+    """Webhook button click lines"""
+    recent = events.latest('callback', limit=10)
+    if not recent:
+        return []
+    return ['', f"{YELLOW}🔘 TELEGRAM BUTTON CLICKS DETECTED{RESET}"] + [f"  {e.text[-100:]}" for e in recent]
+
+
 def monitor_freqtrade():
     """Monitor Freqtrade for DCA triggers"""
-    logs = get_freqtrade_logs()
-    
-    # Look for DCA-related messages
-    if 'DCA' in logs or 'adjust_trade_position' in logs or 'Telegram' in logs:
-        print(f"\n{GREEN}📊 FREQTRADE DCA ACTIVITY DETECTED{RESET}")
-        
-        # Show relevant lines
-        for line in logs.split('\n'):
-            if any(keyword in line for keyword in ['DCA', 'adjust_trade', 'telegram', 'trade', 'Sold', 'Bought']):
-                if 'DEBUG' not in line:  # Skip debug spam
-                    print(f"  {line[:120]}")
+    print('\n'.join(freqtrade_panel()))
 
 
 def monitor_telegram():
     """Monitor for Telegram messages sent"""
-    logs = get_freqtrade_logs()
-    
-    if 'sendMessage' in logs or 'Telegram' in logs or 'sent' in logs.lower():
-        print(f"\n{BLUE}💬 TELEGRAM MESSAGE ACTIVITY{RESET}")
-        
-        for line in logs.split('\n'):
-            if 'telegram' in line.lower() or 'sent' in line.lower():
-                if any(x not in line for x in ['DEBUG', 'DEBUG']):
-                    print(f"  {line[:120]}")
+    print('\n'.join(telegram_panel()))
 
 
 def monitor_webhooks():
     """Monitor webhook for button clicks"""
-    logs = get_webhook_logs()
-    
-    # Look for callback detections
-    if 'CALLBACK DETECTED' in logs or 'accepted' in logs or 'declined' in logs:
-        print(f"\n{YELLOW}🔘 TELEGRAM BUTTON CLICKS DETECTED{RESET}")
-        
-        for line in logs.split('\n'):
-            if 'CALLBACK' in line or 'accepted' in line or 'declined' in line:
-                if 'INFO' in line or '🎯' in line:
-                    print(f"  {line[-100:]}")
+    print('\n'.join(webhook_panel()))
 
 
-def monitor_confirmations():
-    """Monitor confirmation file for status changes"""
-    confirmations = load_confirmations()
-    
-    if not confirmations:
-        return
+def format_confirmation_row(details):
+    """Format one confirmation as a table row"""
+    status = details.get('status', '?')
+    pair = details.get('pair', '?')
+    entry = details.get('entry_rate', 0)
+    stake = details.get('stake', 0)
     
-    print(f"\n{BRIGHT}{BLUE}📋 CURRENT DCA CONFIRMATIONS{RESET}")
-    print(f"{'─' * 80}")
+    if status == 'confirmed':
+        symbol = f"{GREEN}✅{RESET}"
+    elif status == 'pending':
+        symbol = f"{YELLOW}⏳{RESET}"
+    elif status == 'declined':
+        symbol = f"{RED}❌{RESET}"
+    else:
+        symbol = "❓"
     
-    confirmed_count = 0
-    pending_count = 0
-    declined_count = 0
+    timestamp = str(details.get('timestamp', ''))[:19]
     
-    for order_id, details in confirmations.items():
-        status = details.get('status', '?')
-        pair = details.get('pair', '?')
-        entry = details.get('entry_rate', 0)
-        stake = details.get('stake', 0)
-        
-        if status == 'confirmed':
-            confirmed_count += 1
-            symbol = f"{GREEN}✅{RESET}"
-        elif status == 'pending':
-            pending_count += 1
-            symbol = f"{YELLOW}⏳{RESET}"
-        elif status == 'declined':
-            declined_count += 1
-            symbol = f"{RED}❌{RESET}"
-        else:
-            symbol = "❓"
-        
-        timestamp = details.get('timestamp', '')[:19]
-        
-        print(f"{symbol} {pair:12} @ ${entry:>10.2f} | ${stake:>7.2f} USDT | [{status:9}] {timestamp}")
-    
-    print(f"{'─' * 80}")
-    print(f"{GREEN}Confirmed:{RESET} {confirmed_count}  {YELLOW}Pending:{RESET} {pending_count}  {RED}Declined:{RESET} {declined_count}")
+    return f"{symbol} {pair:12} @ ${entry:>10.2f} | ${stake:>7.2f} USDT | [{status:9}] {timestamp}"
 
 
-def show_dashboard():
-    """Display full monitoring dashboard"""
-    while True:
-        # Clear screen on Unix
-        subprocess.run(['clear'], capture_output=True)
-        
-        print(f"\n{BRIGHT}{'='*80}{RESET}")
-        print(f"{BRIGHT}🚀 REAL-TIME DCA CONFIRMATION MONITORING{RESET}")
-        print(f"{BRIGHT}{'='*80}{RESET}")
-        print(f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        print()
+class ConfirmationsView:
+    """
+    Confirmations table that re-reads the store only when its mtime changes
+    and re-formats only the rows (keyed by DCA id) whose details changed.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.mtime = None
+        self.details = {}
+        self.rows = {}
+        self.counts = {'confirmed': 0, 'pending': 0, 'declined': 0}
+
+    def refresh(self):
+        """Reload if the file changed; returns the set of changed DCA ids"""
+        try:
+            mtime = self.path.stat().st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime == self.mtime:
+            return set()
+        self.mtime = mtime
+        confirmations = load_confirmations() if mtime is not None else {}
         
-        # Monitor all sources
-        monitor_freqtrade()
-        monitor_telegram()
-        monitor_webhooks()
-        monitor_confirmations()
+        changed = set(self.details) - set(confirmations)
+        for order_id in changed:
+            self.details.pop(order_id, None)
+            self.rows.pop(order_id, None)
+        for order_id, details in confirmations.items():
+            if self.details.get(order_id) != details:
+                self.details[order_id] = details
+                self.rows[order_id] = format_confirmation_row(details)
+                changed.add(order_id)
         
-        # Status checks
-        print(f"\n{BRIGHT}🔍 SYSTEM STATUS{RESET}")
+        self.counts = {'confirmed': 0, 'pending': 0, 'declined': 0}
+        for details in self.details.values():
+            status = details.get('status')
+            if status in self.counts:
+                self.counts[status] += 1
+        return changed
+
+    def lines(self):
+        if not self.rows:
+            return []
+        return (
+            ['', f"{BRIGHT}{BLUE}📋 CURRENT DCA CONFIRMATIONS{RESET}", f"{'─' * 80}"]
+            + list(self.rows.values())
+            + [
+                f"{'─' * 80}",
+                f"{GREEN}Confirmed:{RESET} {self.counts['confirmed']}  "
+                f"{YELLOW}Pending:{RESET} {self.counts['pending']}  "
+                f"{RED}Declined:{RESET} {self.counts['declined']}",
+            ]
+        )
+
+
+confirmations_view = ConfirmationsView(CONFIRMATIONS_FILE)
+
+
+snapshot_reader = SnapshotReader(SNAPSHOT_FILE)
+
+
+def market_panel():
+    """Live price and indicators for pairs with a pending DCA, from the strategy snapshot"""
+    pending = sorted({
+        details.get('pair') for details in confirmations_view.details.values()
+        if details.get('status') == 'pending' and details.get('pair')
+    })
+    if not pending:
+        return []
+    snapshot = snapshot_reader.read()
+    lines = ['', f"{BRIGHT}{BLUE}📈 MARKET CONTEXT (pending DCAs){RESET}"]
+    for pair in pending:
+        latest = snapshot.get(pair)
+        if latest is None:
+            lines.append(f"  {pair:14} no snapshot data")
+            continue
+        candle = datetime.fromtimestamp(latest['date']).strftime('%H:%M')
+        signal = 'long' if latest['enter_long'] else 'short' if latest['enter_short'] else '-'
+        lines.append(
+            f"  {pair:14} {latest['close']:>12.6g} | RSI {latest['rsi']:5.1f} "
+            f"(1h {latest['rsi_1h']:5.1f}) | DI {latest['DI_values']:+6.1f} | entry {signal:5} [{candle}]"
+        )
+    return lines
+
+
+def monitor_confirmations():
+    """Monitor confirmation file for status changes"""
+    confirmations_view.refresh()
+    print('\n'.join(confirmations_view.lines()))
+
+
+class ServiceProbe:
+    """
+    In-process HTTP health probe over a kept-alive connection. Checks the
+    status code and the JSON payload, and keeps rolling latency and uptime.
+    Timed-out probes enter the latency window at their elapsed time, other
+    failures are counted next to the percentiles. A probe still in flight
+    is skipped, so its connection is never used from two threads.
+    """
+
+    def __init__(self, name, url, expect, timeout=2.0, history=120):
+        self.name = name
+        self.url = urlsplit(url)
+        self.expect = expect
+        self.timeout = timeout
+        self.latencies = deque(maxlen=history)
+        # 'ok', 'failed' or 'timeout' per probe
+        self.results = deque(maxlen=history)
+        self.last_status = "❓ Unknown"
+        self._conn = None
+        self._in_flight = threading.Lock()
+
+    def _connection(self):
+        if self._conn is None:
+            conn_class = http.client.HTTPSConnection if self.url.scheme == 'https' else http.client.HTTPConnection
+            self._conn = conn_class(self.url.hostname, self.url.port, timeout=self.timeout)
+        return self._conn
+
+    def probe(self):
+        """Run one probe and record its outcome; None if the previous one is still running"""
+        if not self._in_flight.acquire(blocking=False):
+            self.last_status = "⏳ Still probing"
+            return None
         try:
-            ft_result = subprocess.run(['curl', '-s', 'http://localhost:8080/api/v1/ping'], 
-                                      capture_output=True, text=True, timeout=2)
-            ft_status = "✅ Running" if ft_result.returncode == 0 else "❌ Error"
-        except:
-            ft_status = "❌ Unavailable"
-        
+            return self._probe()
+        finally:
+            self._in_flight.release()
+
+    def _probe(self):
+        start = time.monotonic()
         try:
-            wh_result = subprocess.run(['curl', '-s', 'http://localhost:5555/health'],
-                                      capture_output=True, text=True, timeout=2)
-            wh_status = "✅ Running" if wh_result.returncode == 0 else "❌ Error"
-        except:
-            wh_status = "❌ Unavailable"
-        
-        print(f"  Freqtrade:  {ft_status}")
-        print(f"  Webhook:    {wh_status}")
-        
-        print(f"\n{BRIGHT}{'='*80}{RESET}")
-        print(f"Refreshing in 5 seconds... (Press Ctrl+C to exit)")
-        print(f"{'='*80}{RESET}\n")
-        
-        time.sleep(5)
+            conn = self._connection()
+            conn.request('GET', self.url.path or '/', headers={'Connection': 'keep-alive'})
+            response = conn.getresponse()
+            body = response.read()
+            if response.status != 200:
+                outcome, status = 'failed', f"❌ HTTP {response.status}"
+            else:
+                payload = json.loads(body or b'{}')
+                if all(payload.get(key) == value for key, value in self.expect.items()):
+                    outcome, status = 'ok', "✅ Running"
+                else:
+                    outcome, status = 'failed', f"❌ Unexpected payload {str(payload)[:40]}"
+            self.latencies.append(time.monotonic() - start)
+        except Exception as e:
+            # Drop the connection so the next probe reconnects
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            if isinstance(e, socket.timeout):
+                # At least this slow: keeps a service that starts timing out from looking faster
+                self.latencies.append(time.monotonic() - start)
+                outcome, status = 'timeout', f"❌ Timed out after {self.timeout:g}s"
+            else:
+                outcome, status = 'failed', f"❌ Unavailable ({type(e).__name__})"
+        self.results.append(outcome)
+        self.last_status = status
+        return outcome == 'ok'
+
+    def percentile(self, pct):
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+    def uptime(self):
+        if not self.results:
+            return None
+        return 100 * self.results.count('ok') / len(self.results)
+
+    def summary(self):
+        parts = [f"{self.last_status:<12}"]
+        if self.latencies:
+            p50, p95, p99 = (self.percentile(p) * 1000 for p in (50, 95, 99))
+            parts.append(f"p50 {p50:.0f}ms p95 {p95:.0f}ms p99 {p99:.0f}ms")
+        failed, timeouts = self.results.count('failed'), self.results.count('timeout')
+        if failed or timeouts:
+            parts.append(f"{failed} failed, {timeouts} timed out")
+        if self.results:
+            parts.append(f"uptime {self.uptime():.1f}% ({len(self.results)} probes)")
+        return "  ".join(parts)
+
+
+PROBE_TIMEOUT = float(os.getenv('MONITOR_PROBE_TIMEOUT', '2'))
+probes = [
+    ServiceProbe('Freqtrade', os.getenv('FREQTRADE_PING_URL', 'http://localhost:8080/api/v1/ping'),
+                 {'status': 'pong'}, timeout=PROBE_TIMEOUT),
+    ServiceProbe('Webhook', os.getenv('WEBHOOK_HEALTH_URL', 'http://localhost:5555/health'),
+                 {'status': 'ok'}, timeout=PROBE_TIMEOUT),
+]
+# Spare workers so skipped probes still get a thread while a hung one holds its own
+probe_pool = ThreadPoolExecutor(max_workers=2 * len(probes), thread_name_prefix='probe')
+
+
+def run_probes():
+    """
+    Probe all services concurrently; bounded by the slowest single timeout.
+    A probe left running past the wait keeps its worker and is skipped next tick.
+    """
+    futures = [probe_pool.submit(probe.probe) for probe in probes]
+    wait(futures, timeout=PROBE_TIMEOUT + 1)
+
+
+def status_panel():
+    """Service health lines"""
+    run_probes()
+    return ['', f"{BRIGHT}🔍 SYSTEM STATUS{RESET}"] + [
+        f"  {probe.name + ':':<11} {probe.summary()}" for probe in probes
+    ]
+
+
+def dashboard_lines(interval):
+    """Build the full dashboard frame as a list of lines"""
+    confirmations_view.refresh()
+    return (
+        [
+            '',
+            f"{BRIGHT}{'='*80}{RESET}",
+            f"{BRIGHT}🚀 REAL-TIME DCA CONFIRMATION MONITORING{RESET}",
+            f"{BRIGHT}{'='*80}{RESET}",
+            f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+        ]
+        + freqtrade_panel()
+        + telegram_panel()
+        + webhook_panel()
+        + confirmations_view.lines()
+        + market_panel()
+        + status_panel()
+        + [
+            '',
+            f"{BRIGHT}{'='*80}{RESET}",
+            f"Refreshing every {interval:g} seconds... (Press Ctrl+C to exit)",
+            f"{'='*80}{RESET}",
+        ]
+    )
+
+
+SGR_OR_CHAR = re.compile(r'(\033\[[0-9;]*m)|(.)', re.DOTALL)
+
+
+def char_width(char):
+    """Terminal columns taken by a character: 2 for wide (emoji, CJK), 0 for combining marks"""
+    if unicodedata.combining(char) or unicodedata.category(char) in ('Mn', 'Me', 'Cf'):
+        return 0
+    return 2 if unicodedata.east_asian_width(char) in ('W', 'F') else 1
+
+
+def screen_cells(line, columns):
+    """
+    {column: (style, text)} for the visible characters of a line with SGR colour
+    codes, clipped to the terminal width, and the column after the last one.
+    """
+    cells, style, column = {}, '', 1
+    last = None
+    for match in SGR_OR_CHAR.finditer(line):
+        sgr, char = match.groups()
+        if sgr:
+            style = '' if sgr in ('\033[0m', '\033[m') else style + sgr
+            continue
+        width = char_width(char)
+        if width == 0:
+            # Combining mark or variation selector: part of the previous cell
+            if last is not None:
+                cells[last] = (cells[last][0], cells[last][1] + char)
+            continue
+        if column + width - 1 > columns:
+            break
+        cells[column] = (style, char)
+        last = column
+        column += width
+    return cells, column
+
+
+class ScreenRenderer:
+    """
+    Full-screen renderer on the alternate screen buffer. Keeps the previous
+    frame as screen cells (column, colour, character) and rewrites only the
+    runs of cells that changed, in place, via cursor moves.
+    """
+
+    def __init__(self, stream=sys.stdout):
+        self.stream = stream
+        self.previous = []
+        self.size = None
+
+    def __enter__(self):
+        # Alternate screen, hide cursor
+        self.stream.write('\033[?1049h\033[?25l\033[H\033[2J')
+        self.stream.flush()
+        return self
+
+    def __exit__(self, *exc):
+        # Show cursor, leave alternate screen
+        self.stream.write('\033[?25h\033[?1049l')
+        self.stream.flush()
+
+    @staticmethod
+    def _row_changes(row, old, new):
+        """Escape sequences that turn row `old` (cells, end) into `new`"""
+        old_cells, old_end = old
+        new_cells, new_end = new
+        out = []
+        style = None
+        previous_column = None
+        for column, cell in new_cells.items():
+            if old_cells.get(column) == cell:
+                continue
+            if previous_column is None or column != previous_column:
+                # Start of a run of changed cells
+                out.append(f"\033[{row + 1};{column}H")
+                style = None
+            if cell[0] != style:
+                style = cell[0]
+                out.append('\033[0m' + style)
+            out.append(cell[1])
+            previous_column = column + char_width(cell[1][0])
+        if style:
+            out.append('\033[0m')
+        if old_end > new_end:
+            out.append(f"\033[{row + 1};{new_end}H\033[K")
+        return out
+
+    def draw(self, lines):
+        size = shutil.get_terminal_size()
+        if size != self.size:
+            # Resized: positions are stale, repaint everything
+            self.size = size
+            self.previous = []
+            self.stream.write('\033[H\033[2J')
+        lines = lines[:size.lines]
+        frame = [screen_cells(line, size.columns) for line in lines]
+        empty = ({}, 1)
+        out = []
+        for row, cells in enumerate(frame):
+            old = self.previous[row] if row < len(self.previous) else empty
+            if old != cells:
+                out.extend(self._row_changes(row, old, cells))
+        for row in range(len(frame), len(self.previous)):
+            out.append(f"\033[{row + 1};1H\033[K")
+        if out:
+            self.stream.write(''.join(out))
+            self.stream.flush()
+        self.previous = frame
+
+
+def show_dashboard(interval=5, tui=False):
+    """Display full monitoring dashboard"""
+    start_followers()
+    if tui:
+        with ScreenRenderer() as renderer:
+            while True:
+                renderer.draw(dashboard_lines(interval))
+                time.sleep(interval)
+    
+    while True:
+        # Clear screen and redraw from the top
+        sys.stdout.write('\033[H\033[2J' + '\n'.join(dashboard_lines(interval)) + '\n\n')
+        sys.stdout.flush()
+        time.sleep(interval)
 
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Real-time DCA confirmation monitoring dashboard')
+    parser.add_argument('--tui', action='store_true',
+                        help='full-screen mode that only redraws changed cells')
+    parser.add_argument('--interval', type=float, default=float(os.getenv('MONITOR_INTERVAL', '5')),
+                        help='refresh interval in seconds (default: 5)')
+    args = parser.parse_args()
     try:
-        show_dashboard()
+        show_dashboard(interval=args.interval, tui=args.tui)
     except KeyboardInterrupt:
         print(f"\n{YELLOW}📊 Monitoring stopped{RESET}")
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Incremental DCA analytics over the freqtrade trades database
+Reads tradesv3.sqlite read-only and keeps running aggregates per pair and
+enter tag in a side store, resuming from the last processed order id
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+from collections import defaultdict
+from datetime import datetime
+
+SIDE_STORE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+-- Running totals per (pair, enter_tag)
+CREATE TABLE IF NOT EXISTS groups (
+    pair TEXT NOT NULL,
+    enter_tag TEXT NOT NULL,
+    trades INTEGER NOT NULL DEFAULT 0,
+    dca_trades INTEGER NOT NULL DEFAULT 0,
+    entry_fills INTEGER NOT NULL DEFAULT 0,
+    exit_fills INTEGER NOT NULL DEFAULT 0,
+    partial_exits INTEGER NOT NULL DEFAULT 0,
+    entry_gap_seconds REAL NOT NULL DEFAULT 0,
+    entry_gaps INTEGER NOT NULL DEFAULT 0,
+    closed_dca INTEGER NOT NULL DEFAULT 0,
+    pnl_dca REAL NOT NULL DEFAULT 0,
+    closed_plain INTEGER NOT NULL DEFAULT 0,
+    pnl_plain REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (pair, enter_tag)
+);
+-- Stake per ladder level (1 = initial entry, 2+ = safety orders)
+CREATE TABLE IF NOT EXISTS ladder (
+    pair TEXT NOT NULL,
+    enter_tag TEXT NOT NULL,
+    level INTEGER NOT NULL,
+    fills INTEGER NOT NULL DEFAULT 0,
+    stake REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (pair, enter_tag, level)
+);
+-- Per-trade state, kept only while the trade is open
+CREATE TABLE IF NOT EXISTS open_trades (
+    trade_id INTEGER PRIMARY KEY,
+    pair TEXT NOT NULL,
+    enter_tag TEXT NOT NULL,
+    entries INTEGER NOT NULL DEFAULT 0,
+    exits INTEGER NOT NULL DEFAULT 0,
+    last_entry_ts REAL
+);
+"""
+
+# Filled orders joined with their trade; `?` placeholders are filled per query
+ORDER_QUERY = """
+SELECT o.id, o.ft_trade_id, o.ft_order_side, o.ft_is_open, COALESCE(o.filled, 0),
+       COALESCE(o.cost, 0), o.order_filled_date, o.order_date,
+       t.pair, COALESCE(t.enter_tag, ''), t.is_short
+FROM orders o JOIN trades t ON t.id = o.ft_trade_id
+WHERE {where}
+ORDER BY o.id
+"""
+
+
+def open_trades_db(path):
+    """Open the freqtrade database read-only"""
+    return sqlite3.connect(f"file:{os.path.abspath(path)}?mode=ro", uri=True)
+
+
+def open_side_store(path):
+    store = sqlite3.connect(path)
+    store.executescript(SIDE_STORE_SCHEMA)
+    return store
+
+
+def get_meta(store, key, default):
+    row = store.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return json.loads(row[0]) if row else default
+
+
+def set_meta(store, key, value):
+    store.execute(
+        "INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+        (key, json.dumps(value)),
+    )
+
+
+def _timestamp(value):
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value)).timestamp()
+    except ValueError:
+        return None
+
+
+def _bump(store, table, keys, **increments):
+    """Add increments to one aggregate row, creating it if needed"""
+    key_cols = list(keys)
+    cols = key_cols + list(increments)
+    store.execute(
+        f"INSERT INTO {table} ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))}) "
+        f"ON CONFLICT({', '.join(key_cols)}) DO UPDATE SET "
+        + ", ".join(f"{col} = {col} + excluded.{col}" for col in increments),
+        list(keys.values()) + list(increments.values()),
+    )
+
+
+def apply_order(store, row):
+    """Fold one filled order into the aggregates"""
+    (_, trade_id, side, _, filled, cost, filled_date, order_date, pair, enter_tag, is_short) = row
+    group = {'pair': pair, 'enter_tag': enter_tag}
+    state = store.execute(
+        "SELECT entries, exits, last_entry_ts FROM open_trades WHERE trade_id = ?", (trade_id,)
+    ).fetchone()
+    if state is None:
+        store.execute(
+            "INSERT INTO open_trades (trade_id, pair, enter_tag) VALUES (?, ?, ?)",
+            (trade_id, pair, enter_tag),
+        )
+        _bump(store, 'groups', group, trades=1)
+        state = (0, 0, None)
+    entries, exits, last_entry_ts = state
+
+    entry_side = 'sell' if is_short else 'buy'
+    if side == entry_side:
+        level = entries + 1
+        ts = _timestamp(filled_date or order_date)
+        gap = ts - last_entry_ts if ts is not None and last_entry_ts is not None else None
+        _bump(store, 'ladder', {**group, 'level': level}, fills=1, stake=cost)
+        _bump(
+            store, 'groups', group,
+            entry_fills=1,
+            dca_trades=1 if level == 2 else 0,
+            entry_gap_seconds=gap or 0.0,
+            entry_gaps=1 if gap is not None else 0,
+        )
+        store.execute(
+            "UPDATE open_trades SET entries = ?, last_entry_ts = ? WHERE trade_id = ?",
+            (level, ts if ts is not None else last_entry_ts, trade_id),
+        )
+    else:
+        _bump(store, 'groups', group, exit_fills=1)
+        store.execute("UPDATE open_trades SET exits = ? WHERE trade_id = ?", (exits + 1, trade_id))
+
+
+def close_trades(store, trades_db):
+    """Book realized PnL for tracked trades that have closed since the last run"""
+    tracked = store.execute("SELECT trade_id, pair, enter_tag, entries, exits FROM open_trades").fetchall()
+    if not tracked:
+        return 0
+    state = {row[0]: row[1:] for row in tracked}
+    closed = 0
+    ids = list(state)
+    for start in range(0, len(ids), 500):
+        chunk = ids[start:start + 500]
+        rows = trades_db.execute(
+            f"SELECT id, COALESCE(close_profit_abs, realized_profit, 0) FROM trades "
+            f"WHERE is_open = 0 AND id IN ({', '.join('?' * len(chunk))})",
+            chunk,
+        ).fetchall()
+        for trade_id, profit in rows:
+            pair, enter_tag, entries, exits = state[trade_id]
+            group = {'pair': pair, 'enter_tag': enter_tag}
+            if entries > 1:
+                _bump(store, 'groups', group, closed_dca=1, pnl_dca=profit)
+            else:
+                _bump(store, 'groups', group, closed_plain=1, pnl_plain=profit)
+            # Every exit fill but the one that closed the trade was partial
+            _bump(store, 'groups', group, partial_exits=max(0, exits - 1))
+            store.execute("DELETE FROM open_trades WHERE trade_id = ?", (trade_id,))
+            closed += 1
+    return closed
+
+
+def update(trades_db, store):
+    """
+    Process orders added since the last run. Orders that were still open
+    are remembered and re-checked, so late fills are not lost while work
+    stays proportional to new and open orders.
+    """
+    last_order_id = get_meta(store, 'last_order_id', 0)
+    deferred = get_meta(store, 'deferred_order_ids', [])
+
+    rows = trades_db.execute(ORDER_QUERY.format(where="o.id > ?"), (last_order_id,)).fetchall()
+    if deferred:
+        rows += trades_db.execute(
+            ORDER_QUERY.format(where=f"o.id IN ({', '.join('?' * len(deferred))})"), deferred
+        ).fetchall()
+        rows.sort(key=lambda row: row[0])
+
+    still_open = []
+    processed = 0
+    for row in rows:
+        order_id, ft_is_open, filled = row[0], row[3], row[4]
+        last_order_id = max(last_order_id, order_id)
+        if ft_is_open:
+            still_open.append(order_id)
+            continue
+        if filled > 0:
+            apply_order(store, row)
+            processed += 1
+
+    closed = close_trades(store, trades_db)
+    set_meta(store, 'last_order_id', last_order_id)
+    set_meta(store, 'deferred_order_ids', still_open)
+    store.commit()
+    return processed, closed
+
+
+def report(store, group_by='enter_tag'):
+    """Print aggregates per pair or per enter tag"""
+    totals = defaultdict(lambda: defaultdict(float))
+    cursor = store.execute("SELECT * FROM groups")
+    columns = [d[0] for d in cursor.description]
+    for row in cursor:
+        values = dict(zip(columns, row))
+        key = values[group_by] or '(none)'
+        for column, value in values.items():
+            if column not in ('pair', 'enter_tag'):
+                totals[key][column] += value
+
+    ladder = defaultdict(lambda: defaultdict(lambda: [0, 0.0]))
+    for pair, enter_tag, level, fills, stake in store.execute("SELECT * FROM ladder"):
+        key = (pair if group_by == 'pair' else enter_tag) or '(none)'
+        ladder[key][level][0] += fills
+        ladder[key][level][1] += stake
+    max_level = max((level for levels in ladder.values() for level in levels), default=1)
+
+    level_headers = " ".join(f"{f'L{level} stake':>10}" for level in range(1, max_level + 1))
+    print(
+        f"{group_by:<22} {'trades':>6} {'entries':>7} {'DCA%':>6} {'depth':>5} {'pexit':>5} "
+        f"{'SO gap':>7} {level_headers} {'PnL DCA':>10} {'PnL noDCA':>10}"
+    )
+    print('-' * (84 + 11 * max_level))
+    for key in sorted(totals):
+        t = totals[key]
+        trades = t['trades'] or 1
+        gap = t['entry_gap_seconds'] / t['entry_gaps'] / 3600 if t['entry_gaps'] else 0
+        stakes = " ".join(
+            f"{(ladder[key][level][1] / ladder[key][level][0]) if ladder[key][level][0] else 0:>10.2f}"
+            for level in range(1, max_level + 1)
+        )
+        print(
+            f"{key:<22} {int(t['trades']):>6} {int(t['entry_fills']):>7} "
+            f"{100 * t['dca_trades'] / trades:>5.1f}% {t['entry_fills'] / trades:>5.2f} "
+            f"{t['partial_exits'] / trades:>5.2f} {gap:>6.1f}h {stakes} "
+            f"{t['pnl_dca']:>10.2f} {t['pnl_plain']:>10.2f}"
+        )
+    print()
+    print("DCA% = trades with at least one safety-order fill; depth = entry fills per trade;")
+    print("pexit = partial exits per trade; SO gap = mean time between entry fills;")
+    print("Lx stake = mean stake at ladder level x; PnL = realized PnL of closed trades.")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Incremental DCA analytics over the freqtrade trades DB')
+    parser.add_argument('--db', default='user_data/tradesv3.sqlite', help='freqtrade trades database')
+    parser.add_argument('--store', default='user_data/dca_analytics.sqlite', help='side store for aggregates')
+    parser.add_argument('--group-by', choices=['enter_tag', 'pair'], default='enter_tag')
+    parser.add_argument('--update-only', action='store_true', help='update aggregates without printing')
+    parser.add_argument('--reset', action='store_true', help='drop the side store and rebuild from scratch')
+    args = parser.parse_args()
+
+    if args.reset and os.path.exists(args.store):
+        os.remove(args.store)
+    trades_db = open_trades_db(args.db)
+    store = open_side_store(args.store)
+    processed, closed = update(trades_db, store)
+    print(f"Processed {processed} new filled orders, {closed} newly closed trades")
+    if not args.update_only:
+        print()
+        report(store, args.group_by)
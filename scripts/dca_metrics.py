@@ -0,0 +1,230 @@
+"""
+Minimal Prometheus-style metrics for the DCA webhook
+Counters, gauges and histograms rendered in the text exposition format
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = dict(self._values)
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(values.items())
+        ]
+
+
+class Gauge(_Metric):
+    """
+    Gauge set directly or computed at scrape time by a callback. A labelled
+    gauge's callback returns {label values tuple: value}.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, *args, callback: Optional[Callable[[], object]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self.callback = callback
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def render(self) -> List[str]:
+        if self.callback is not None:
+            value = self.callback()
+            if self.labelnames:
+                with self._lock:
+                    self._values = {tuple(map(str, key)): v for key, v in value.items()}
+            else:
+                self.set(value)
+        with self._lock:
+            values = dict(self._values)
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(values.items())
+        ]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, *args, buckets: Iterable[float] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [bucket counts..., +Inf count], sum
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[index] += 1
+            total[0] += value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = {key: (list(counts), total[0]) for key, (counts, total) in self._values.items()}
+        lines = self.header()
+        for key, (counts, total) in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class Registry:
+    """Collection of metrics rendered together for a /metrics scrape"""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+              callback: Optional[Callable[[], object]] = None) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames, callback=callback))
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                  buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets=buckets))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+callbacks_total = registry.counter(
+    "dca_callbacks_total", "DCA button callbacks by outcome", ["outcome", "bot"]
+)
+getupdates_seconds = registry.histogram(
+    "dca_getupdates_duration_seconds", "getUpdates long-poll round-trip time"
+)
+getupdates_batch_size = registry.histogram(
+    "dca_getupdates_batch_size", "Updates returned per getUpdates call",
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100),
+)
+telegram_request_seconds = registry.histogram(
+    "dca_telegram_request_duration_seconds", "Telegram Bot API request latency", ["method"]
+)
+store_operation_seconds = registry.histogram(
+    "dca_store_operation_duration_seconds", "Confirmation store read/write duration", ["operation"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0),
+)
+store_size_bytes = registry.gauge(
+    "dca_store_size_bytes", "Size of the confirmation store file", ["bot"]
+)
+store_entries = registry.gauge(
+    "dca_store_entries", "Confirmations in the store by status", ["status", "bot"]
+)
+
+# Per bot: epoch seconds of the oldest pending confirmation seen at the last store access
+_oldest_pending: Dict[str, Optional[float]] = {}
+
+
+def _oldest_pending_age() -> Dict[Tuple[str], float]:
+    now = time.time()
+    return {
+        (bot,): max(0.0, now - timestamp) if timestamp is not None else 0.0
+        for bot, timestamp in list(_oldest_pending.items())
+    }
+
+
+oldest_pending_age_seconds = registry.gauge(
+    "dca_oldest_pending_age_seconds", "Age of the oldest pending DCA confirmation", ["bot"],
+    callback=_oldest_pending_age,
+)
+
+
+def _to_epoch(value) -> Optional[float]:
+    try:
+        if isinstance(value, (int, float)):
+            return float(value)
+        parsed = datetime.fromisoformat(str(value))
+        if parsed.tzinfo is None:
+            # Timestamps written with datetime.now() are local time
+            return parsed.timestamp()
+        return parsed.astimezone(timezone.utc).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def observe_store(data: Dict[str, dict], size: int, bot: str = "default") -> None:
+    """Update a bot's store gauges from freshly loaded or saved confirmations"""
+    store_size_bytes.set(size, bot=bot)
+    counts: Dict[str, int] = {"pending": 0, "confirmed": 0, "declined": 0}
+    oldest = None
+    for details in data.values():
+        status = str(details.get("status", "unknown"))
+        counts[status] = counts.get(status, 0) + 1
+        if status == "pending":
+            timestamp = _to_epoch(details.get("timestamp"))
+            if timestamp is not None and (oldest is None or timestamp < oldest):
+                oldest = timestamp
+    for status, count in counts.items():
+        store_entries.set(count, status=status, bot=bot)
+    _oldest_pending[bot] = oldest
@@ -0,0 +1,101 @@
+"""
+Reader for the strategy's memory-mapped indicator snapshot
+FreqAi_NoTank4h rewrites one fixed-size record per pair every candle; the
+header carries a sequence counter that is odd while a record is being written
+"""
+
+import mmap
+import os
+import struct
+import time
+from typing import Dict, Optional
+
+SNAPSHOT_FILE = os.getenv('DCA_SNAPSHOT_FILE', '/freqtrade/user_data/indicator_snapshot.bin')
+
+# Layout (little endian), mirrored by IndicatorSnapshot in the strategy
+MAGIC = b'DCASNAP1'
+VERSION = 1
+# magic, version, record size, capacity, count, seq, updated_at (epoch seconds)
+HEADER = struct.Struct('<8sIIIIQd')
+HEADER_SIZE = 64
+SEQ_OFFSET = 24
+# pair, candle date (epoch), 6 indicator values, 5 signal flags
+RECORD = struct.Struct('<32sddddddd5b3x')
+VALUE_FIELDS = ('close', 'rsi', 'DI_values', 'mmlextreme_oscillator', 'rsi_1h', 'rsi_4h')
+SIGNAL_FIELDS = ('extrema', 'enter_long', 'enter_short', 'exit_long', 'exit_short')
+
+
+def _decode(record):
+    pair, date, *rest = record
+    values = rest[:len(VALUE_FIELDS)]
+    signals = rest[len(VALUE_FIELDS):]
+    return {
+        'pair': pair.rstrip(b'\0').decode('utf-8', 'replace'),
+        'date': date,
+        **dict(zip(VALUE_FIELDS, values)),
+        **dict(zip(SIGNAL_FIELDS, signals)),
+    }
+
+
+class SnapshotReader:
+    """
+    Read-only mapping of the snapshot file. Records are unpacked straight from
+    the mapping; a read is retried until the sequence counter is even and
+    unchanged across it, so it never mixes two writes.
+    """
+
+    def __init__(self, path=SNAPSHOT_FILE):
+        self.path = path
+        self._map = None
+        self._size = 0
+
+    def _mapping(self) -> Optional[mmap.mmap]:
+        try:
+            size = os.stat(self.path).st_size
+        except OSError:
+            self.close()
+            return None
+        if self._map is None or size != self._size:
+            self.close()
+            if size < HEADER_SIZE:
+                return None
+            with open(self.path, 'rb') as handle:
+                self._map = mmap.mmap(handle.fileno(), size, access=mmap.ACCESS_READ)
+            self._size = size
+        return self._map
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+            self._size = 0
+
+    def read(self, retries=100) -> Dict[str, dict]:
+        """Latest record per pair, or {} if there is no (valid) snapshot"""
+        buffer = self._mapping()
+        if buffer is None:
+            return {}
+        for _ in range(retries):
+            magic, version, record_size, capacity, count, seq, updated_at = HEADER.unpack_from(buffer, 0)
+            if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+                return {}
+            if seq % 2:
+                time.sleep(0.0005)
+                continue
+            count = min(count, capacity, (self._size - HEADER_SIZE) // RECORD.size)
+            records = [RECORD.unpack_from(buffer, HEADER_SIZE + i * RECORD.size) for i in range(count)]
+            if struct.unpack_from('<Q', buffer, SEQ_OFFSET)[0] == seq:
+                return {record['pair']: record for record in map(_decode, records)}
+        return {}
+
+    def get(self, pair) -> Optional[dict]:
+        return self.read().get(pair)
+
+
+def read_snapshot(path=SNAPSHOT_FILE) -> Dict[str, dict]:
+    """One-shot read of the snapshot file"""
+    reader = SnapshotReader(path)
+    try:
+        return reader.read()
+    finally:
+        reader.close()
@@ -5,66 +5,118 @@ Handles Accept/Decline buttons for DCA orders
 
 import json
 import logging
-from typing import Dict, Any
+import os
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Optional
 from pathlib import Path
 from datetime import datetime
 
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+import dca_metrics
+
 logger = logging.getLogger(__name__)
 
+# A decided order never changes again, whoever taps next
+TERMINAL_STATUSES = ('confirmed', 'declined')
+
 
 class DCAConfirmationManager:
     """Manages DCA order confirmations via Telegram"""
     
-    def __init__(self, data_dir: str = "."):
+    def __init__(self, data_dir: str = ".", bot: str = "default"):
         self.data_dir = Path(data_dir)
+        self.bot = bot
         self.confirmations_file = self.data_dir / "dca_confirmations.json"
         self.load_confirmations()
     
     def load_confirmations(self) -> Dict[str, Any]:
         """Load existing DCA confirmations from disk"""
         if self.confirmations_file.exists():
+            start = time.perf_counter()
             try:
                 with open(self.confirmations_file, 'r') as f:
-                    return json.load(f)
+                    raw = f.read()
+                data = json.loads(raw)
             except Exception as e:
                 logger.error(f"Failed to load confirmations: {e}")
                 return {}
+            dca_metrics.store_operation_seconds.observe(time.perf_counter() - start, operation='read')
+            dca_metrics.observe_store(data, len(raw), self.bot)
+            return data
         return {}
     
     def save_confirmations(self, data: Dict[str, Any]) -> bool:
-        """Save DCA confirmations to disk"""
+        """Save DCA confirmations to disk; replaced atomically so other readers never see a partial file"""
+        start = time.perf_counter()
         try:
-            with open(self.confirmations_file, 'w') as f:
-                json.dump(data, f, indent=2, default=str)
+            raw = json.dumps(data, indent=2, default=str)
+            tmp_path = self.confirmations_file.with_name(self.confirmations_file.name + '.tmp')
+            with open(tmp_path, 'w') as f:
+                f.write(raw)
+            os.replace(tmp_path, self.confirmations_file)
+            dca_metrics.store_operation_seconds.observe(time.perf_counter() - start, operation='write')
+            dca_metrics.observe_store(data, len(raw), self.bot)
             return True
         except Exception as e:
             logger.error(f"Failed to save confirmations: {e}")
             return False
     
+    @contextmanager
+    def locked(self):
+        """Serialize read-modify-write of the store across webhook replicas"""
+        with open(self.confirmations_file.with_name(self.confirmations_file.name + '.lock'), 'a') as lock:
+            if fcntl is not None:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+    
     def add_pending_confirmation(self, dca_id: str, details: Dict[str, Any]) -> bool:
         """Add a pending DCA confirmation"""
         try:
-            confirmations = self.load_confirmations()
-            confirmations[dca_id] = {
-                **details,
-                'status': 'pending',
-                'timestamp': datetime.now().isoformat(),
-                'timeout_minutes': 10
-            }
-            return self.save_confirmations(confirmations)
+            with self.locked():
+                confirmations = self.load_confirmations()
+                confirmations[dca_id] = {
+                    **details,
+                    'status': 'pending',
+                    'timestamp': datetime.now().isoformat(),
+                    'timeout_minutes': 10
+                }
+                return self.save_confirmations(confirmations)
         except Exception as e:
             logger.error(f"Error adding pending confirmation: {e}")
             return False
     
+    def transition(self, dca_id: str, status: str, **fields) -> Optional[bool]:
+        """
+        Atomically move a pending DCA order to `status`. Confirmed and declined
+        are final: the bot may already have acted on them. Returns None if the
+        order is unknown, False if it was already decided (a repeated or
+        conflicting tap, e.g. replayed after a replica failover) and True if
+        it changed.
+        """
+        with self.locked():
+            confirmations = self.load_confirmations()
+            if dca_id not in confirmations:
+                return None
+            if confirmations[dca_id].get('status') in TERMINAL_STATUSES:
+                return False
+            confirmations[dca_id].update(status=status, **fields)
+            if not self.save_confirmations(confirmations):
+                raise IOError(f"could not save {self.confirmations_file}")
+            return True
+    
     def confirm_dca_order(self, dca_id: str) -> bool:
         """Mark DCA order as confirmed"""
         try:
-            confirmations = self.load_confirmations()
-            if dca_id in confirmations:
-                confirmations[dca_id]['status'] = 'confirmed'
-                confirmations[dca_id]['confirmed_at'] = datetime.now().isoformat()
-                return self.save_confirmations(confirmations)
-            return False
+            return self.transition(dca_id, 'confirmed', confirmed_at=datetime.now().isoformat()) is not None
         except Exception as e:
             logger.error(f"Error confirming order: {e}")
             return False
@@ -72,13 +124,9 @@ class DCAConfirmationManager:
     def decline_dca_order(self, dca_id: str, reason: str = "User declined") -> bool:
         """Mark DCA order as declined"""
         try:
-            confirmations = self.load_confirmations()
-            if dca_id in confirmations:
-                confirmations[dca_id]['status'] = 'declined'
-                confirmations[dca_id]['reason'] = reason
-                confirmations[dca_id]['declined_at'] = datetime.now().isoformat()
-                return self.save_confirmations(confirmations)
-            return False
+            return self.transition(
+                dca_id, 'declined', reason=reason, declined_at=datetime.now().isoformat()
+            ) is not None
         except Exception as e:
             logger.error(f"Error declining order: {e}")
             return False
@@ -95,12 +143,12 @@ class DCAConfirmationManager:
             return 'error'
 
 
-def handle_dca_callback(callback_data: str, user_id: int, data_dir: str = ".") -> Dict[str, Any]:
+def handle_dca_callback(callback_data: str, user_id: int, data_dir: str = ".", bot: str = "default") -> Dict[str, Any]:
     """
     Handle callback from Telegram button clicks
     Called by Freqtrade RPC telegram module
     """
-    manager = DCAConfirmationManager(data_dir)
+    manager = DCAConfirmationManager(data_dir, bot)
     
     response = {
         'success': False,
@@ -111,28 +159,37 @@ def handle_dca_callback(callback_data: str, user_id: int, data_dir: str = ".") -
     try:
         if callback_data.startswith('dca_accept_'):
             dca_id = callback_data.replace('dca_accept_', '')
-            
-            if manager.confirm_dca_order(dca_id):
-                response['success'] = True
-                response['action'] = 'accept'
-                response['message'] = f"✅ DCA Order Confirmed\nOrder ID: {dca_id}\nWill execute at next candle"
-                logger.info(f"DCA {dca_id} accepted by user {user_id}")
-            else:
-                response['message'] = f"❌ Error confirming DCA {dca_id}"
-        
+            changed = manager.transition(dca_id, 'confirmed', confirmed_at=datetime.now().isoformat())
         elif callback_data.startswith('dca_decline_'):
             dca_id = callback_data.replace('dca_decline_', '')
-            
-            if manager.decline_dca_order(dca_id):
-                response['success'] = True
-                response['action'] = 'decline'
-                response['message'] = f"❌ DCA Order Declined\nOrder ID: {dca_id}\nThis DCA order has been skipped"
-                logger.info(f"DCA {dca_id} declined by user {user_id}")
-            else:
-                response['message'] = f"❌ Error declining DCA {dca_id}"
-        
+            changed = manager.transition(
+                dca_id, 'declined', reason="User declined", declined_at=datetime.now().isoformat()
+            )
         else:
             response['message'] = "Unknown DCA action"
+            return response
+        
+        if changed is None:
+            verb = 'confirming' if callback_data.startswith('dca_accept_') else 'declining'
+            response['message'] = f"❌ Error {verb} DCA {dca_id}"
+            return response
+        
+        # A later tap reports the decision on record, not the button it pressed
+        status = manager.get_confirmation_status(dca_id) if not changed else (
+            'confirmed' if callback_data.startswith('dca_accept_') else 'declined'
+        )
+        response['success'] = True
+        response['duplicate'] = not changed
+        if status == 'confirmed':
+            response['action'] = 'accept'
+            response['message'] = f"✅ DCA Order Confirmed\nOrder ID: {dca_id}\nWill execute at next candle"
+        else:
+            response['action'] = 'decline'
+            response['message'] = f"❌ DCA Order Declined\nOrder ID: {dca_id}\nThis DCA order has been skipped"
+        if changed:
+            logger.info(f"DCA {dca_id} {status} by user {user_id}")
+        else:
+            logger.info(f"DCA {dca_id} already {status}; ignoring tap from user {user_id}")
     
     except Exception as e:
         logger.error(f"Error in DCA callback handler: {e}")
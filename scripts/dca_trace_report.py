@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+DCA decision latency report
+Reads the span log written by the strategy and the webhook (dca_trace.jsonl)
+and shows per-stage latency distributions and the slowest DCAs
+"""
+
+import argparse
+import json
+import os
+from collections import defaultdict
+from datetime import datetime
+
+# Stage order of a DCA decision, and the name of each hop between stages
+STAGES = ['requested', 'clicked', 'decided', 'picked_up', 'filled']
+HOPS = {
+    ('requested', 'clicked'): 'human (request -> click)',
+    ('clicked', 'decided'): 'webhook (click -> decision written)',
+    ('decided', 'picked_up'): 'bot loop (decision -> strategy)',
+    ('picked_up', 'filled'): 'execution (strategy -> fill)',
+}
+
+
+def load_spans(path, since=None):
+    """Group spans by DCA id, keeping the first timestamp of each stage"""
+    traces = defaultdict(dict)
+    with open(path, 'r') as f:
+        for line in f:
+            try:
+                span = json.loads(line)
+            except ValueError:
+                continue
+            ts = span.get('ts')
+            if ts is None or (since is not None and ts < since):
+                continue
+            stages = traces[span.get('dca_id', '')]
+            stage = span.get('stage')
+            if stage not in stages or ts < stages[stage]['ts']:
+                stages[stage] = span
+    return traces
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def format_seconds(value):
+    if value >= 120:
+        return f"{value / 60:.1f}m"
+    if value >= 1:
+        return f"{value:.1f}s"
+    return f"{value * 1000:.0f}ms"
+
+
+def hop_latencies(stages):
+    """Latency of every hop present in one trace"""
+    hops = {}
+    for (start, end), name in HOPS.items():
+        if start in stages and end in stages:
+            hops[name] = stages[end]['ts'] - stages[start]['ts']
+    return hops
+
+
+def report(traces, top=10):
+    per_hop = defaultdict(list)
+    totals = []
+    for dca_id, stages in traces.items():
+        for name, latency in hop_latencies(stages).items():
+            per_hop[name].append(latency)
+        present = [stage for stage in STAGES if stage in stages]
+        if len(present) >= 2:
+            total = stages[present[-1]]['ts'] - stages[present[0]]['ts']
+            totals.append((total, dca_id, present[-1]))
+
+    print(f"DCA traces: {len(traces)}")
+    print()
+    print(f"{'Stage':<38} {'n':>5} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8}")
+    print('-' * 80)
+    for name in HOPS.values():
+        values = per_hop.get(name)
+        if not values:
+            print(f"{name:<38} {0:>5}")
+            continue
+        print(
+            f"{name:<38} {len(values):>5} "
+            + " ".join(f"{format_seconds(percentile(values, p)):>8}" for p in (50, 90, 99))
+            + f" {format_seconds(max(values)):>8}"
+        )
+
+    print()
+    print(f"Slowest {top} DCAs (first to last recorded stage)")
+    print('-' * 80)
+    for total, dca_id, last_stage in sorted(totals, reverse=True)[:top]:
+        hops = hop_latencies(traces[dca_id])
+        slowest = max(hops.items(), key=lambda item: item[1])[0] if hops else '-'
+        print(f"{format_seconds(total):>8}  {dca_id}  (up to {last_stage}, mostly {slowest.split(' ')[0]})")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='DCA decision latency report')
+    parser.add_argument('--file', default=os.getenv('DCA_TRACE_FILE', 'user_data/dca_trace.jsonl'),
+                        help='span log (default: user_data/dca_trace.jsonl)')
+    parser.add_argument('--since', help='only spans after this ISO timestamp')
+    parser.add_argument('--top', type=int, default=10, help='number of slowest DCAs to list')
+    args = parser.parse_args()
+
+    since = datetime.fromisoformat(args.since).timestamp() if args.since else None
+    report(load_spans(args.file, since), top=args.top)
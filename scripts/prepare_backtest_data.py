@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Parallel backtest data preparation
+Reads the pair whitelist from config.json and the timeframes from config.json
+and the strategy, then, one process per pair: validates the base-timeframe
+candles (order, duplicates, gaps), derives the informative timeframes from
+them with the strategy's own resample_ohlcv and writes everything as
+uncompressed Feather (Arrow IPC) files in freqtrade's data layout, which
+memory-map without copying. Existing data files are only replaced with
+--overwrite
+"""
+
+import argparse
+import ast
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+
+import pandas as pd
+
+OHLCV_COLUMNS = ['date', 'open', 'high', 'low', 'close', 'volume']
+# Same order freqtrade's data handlers try when looking for existing files
+INPUT_FORMATS = ('feather', 'parquet', 'json', 'jsongz')
+TIMEFRAME_UNITS = {'m': 1, 'h': 60, 'd': 1440, 'w': 10080}
+
+
+def timeframe_minutes(timeframe):
+    return int(timeframe[:-1]) * TIMEFRAME_UNITS[timeframe[-1]]
+
+
+def pair_to_filename(pair):
+    """freqtrade's file name for a pair (misc.pair_to_filename)"""
+    for char in ['/', ' ', '.', '@', '$', '+', ':']:
+        pair = pair.replace(char, '_')
+    return pair
+
+
+def ohlcv_path(datadir, pair, timeframe, trading_mode, fmt):
+    """Path freqtrade uses for a pair's candles"""
+    extension = 'json.gz' if fmt == 'jsongz' else fmt
+    if trading_mode == 'futures':
+        return os.path.join(datadir, 'futures', f"{pair_to_filename(pair)}-{timeframe}-futures.{extension}")
+    return os.path.join(datadir, f"{pair_to_filename(pair)}-{timeframe}.{extension}")
+
+
+def strategy_timeframes(path):
+    """Base timeframe and informative timeframes (populate_indicators_<tf> methods) of a strategy file"""
+    with open(path, 'r') as f:
+        tree = ast.parse(f.read())
+    base, informative = None, []
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Assign, ast.AnnAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            names = [target.id for target in targets if isinstance(target, ast.Name)]
+            if 'timeframe' in names and isinstance(node.value, ast.Constant):
+                base = node.value.value
+        elif isinstance(node, ast.FunctionDef):
+            match = re.fullmatch(r'populate_indicators_(\d+[mhdw])', node.name)
+            if match:
+                informative.append(match.group(1))
+    return base, sorted(set(informative), key=timeframe_minutes)
+
+
+@lru_cache(maxsize=None)
+def strategy_resampler(path):
+    """The strategy's resample_ohlcv, so derived candles are bucketed exactly as the strategy does it"""
+    with open(path, 'r') as f:
+        tree = ast.parse(f.read())
+    for node in tree.body:
+        if isinstance(node, ast.FunctionDef) and node.name == 'resample_ohlcv':
+            namespace = {'pd': pd, 'DataFrame': pd.DataFrame, 'OHLCV_COLUMNS': OHLCV_COLUMNS}
+            exec(compile(ast.Module(body=[node], type_ignores=[]), path, 'exec'), namespace)
+            return namespace['resample_ohlcv']
+    raise ValueError(f"no resample_ohlcv in {path}")
+
+
+def read_ohlcv(path):
+    """Load candles from any freqtrade data format"""
+    if path.endswith('.feather'):
+        frame = pd.read_feather(path)
+    elif path.endswith('.parquet'):
+        frame = pd.read_parquet(path)
+    else:
+        frame = pd.read_json(path, orient='values', compression='infer')
+        frame.columns = OHLCV_COLUMNS
+        frame['date'] = pd.to_datetime(frame['date'], unit='ms', utc=True)
+    frame = frame[OHLCV_COLUMNS]
+    frame['date'] = pd.to_datetime(frame['date'], utc=True)
+    return frame.astype({column: 'float64' for column in OHLCV_COLUMNS[1:]})
+
+
+def find_ohlcv(datadir, pair, timeframe, trading_mode):
+    for fmt in INPUT_FORMATS:
+        path = ohlcv_path(datadir, pair, timeframe, trading_mode, fmt)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def write_feather(frame, path):
+    """Atomically write uncompressed Feather, so readers can memory-map it"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    frame.reset_index(drop=True).to_feather(tmp_path, compression='uncompressed')
+    os.replace(tmp_path, path)
+
+
+def validate(frame, minutes):
+    """Sort, drop duplicate candles and measure gaps; returns (clean frame, stats)"""
+    stats = {'rows': len(frame)}
+    frame = frame.sort_values('date', kind='stable')
+    duplicated = frame['date'].duplicated(keep='last')
+    stats['duplicates'] = int(duplicated.sum())
+    frame = frame[~duplicated].reset_index(drop=True)
+    step = pd.Timedelta(minutes=minutes)
+    stats['misaligned'] = int((frame['date'].dt.floor(step) != frame['date']).sum())
+    deltas = frame['date'].diff().iloc[1:]
+    gaps = deltas[deltas > step]
+    stats['gaps'] = len(gaps)
+    stats['missing_candles'] = int(((gaps // step) - 1).sum()) if len(gaps) else 0
+    stats['largest_gap'] = str(gaps.max()) if len(gaps) else ''
+    stats['first'] = str(frame['date'].iloc[0]) if len(frame) else ''
+    stats['last'] = str(frame['date'].iloc[-1]) if len(frame) else ''
+    return frame, stats
+
+
+def prepare_pair(pair, datadir, trading_mode, base_timeframe, informative_timeframes, strategy_file,
+                 overwrite=False):
+    """Validate one pair's base candles and write base + derived timeframes; returns a report dict"""
+    report = {'pair': pair, 'written': [], 'kept': []}
+    path = find_ohlcv(datadir, pair, base_timeframe, trading_mode)
+    if path is None:
+        report['error'] = f"no {base_timeframe} data"
+        return report
+    resample = strategy_resampler(strategy_file)
+    base_minutes = timeframe_minutes(base_timeframe)
+    base, stats = validate(read_ohlcv(path), base_minutes)
+    report.update(stats)
+
+    # Downloaded files are only replaced on request: without --overwrite they are left as they are
+    target = ohlcv_path(datadir, pair, base_timeframe, trading_mode, 'feather')
+    if overwrite or not os.path.exists(target):
+        write_feather(base, target)
+        report['written'].append(base_timeframe)
+        if path != target:
+            report['converted_from'] = os.path.basename(path)
+    else:
+        report['kept'].append(base_timeframe)
+
+    for timeframe in informative_timeframes:
+        existing = find_ohlcv(datadir, pair, timeframe, trading_mode)
+        if existing is not None and not overwrite:
+            report['kept'].append(timeframe)
+            continue
+        derived = resample(base, timeframe_minutes(timeframe), base_minutes)
+        # Keep older exchange candles from before the base history starts
+        if existing is not None:
+            older = read_ohlcv(existing)
+            if len(derived):
+                older = older[older['date'] < derived['date'].iloc[0]]
+            derived = pd.concat([older.drop_duplicates('date', keep='last'), derived], ignore_index=True)
+        write_feather(derived, ohlcv_path(datadir, pair, timeframe, trading_mode, 'feather'))
+        report['written'].append(timeframe)
+    return report
+
+
+def download(config_path, pairs, timeframe, days):
+    """Fetch only the base timeframe with freqtrade; informative timeframes are derived"""
+    command = [
+        'freqtrade', 'download-data', '--config', config_path, '--timeframes', timeframe,
+        '--days', str(days), '--data-format-ohlcv', 'feather', '--pairs', *pairs,
+    ]
+    print(' '.join(command))
+    subprocess.run(command, check=True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Validate, derive and convert backtest data in parallel')
+    parser.add_argument('--config', default='user_data/config.json')
+    parser.add_argument('--strategy-file', default='user_data/strategies/FreqAi_NoTank4h.py')
+    parser.add_argument('--datadir', help='default: user_data/data/<exchange>')
+    parser.add_argument('--pairs', nargs='+', help='default: the config pair_whitelist')
+    parser.add_argument('--timeframes', nargs='+', help='informative timeframes, default: from the strategy')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(), help='worker processes')
+    parser.add_argument('--download-days', type=int, help='first download this many days of base candles')
+    parser.add_argument('--overwrite', action='store_true',
+                        help='replace existing data files (exchange downloads included) instead of keeping them')
+    args = parser.parse_args()
+
+    with open(args.config, 'r') as f:
+        config = json.load(f)
+    strategy_base, strategy_informative = strategy_timeframes(args.strategy_file)
+    base_timeframe = config.get('timeframe') or strategy_base
+    informative_timeframes = args.timeframes or strategy_informative
+    pairs = args.pairs or config['exchange']['pair_whitelist']
+    trading_mode = config.get('trading_mode', 'spot')
+    datadir = args.datadir or config.get('datadir') or os.path.join(
+        os.path.dirname(os.path.abspath(args.config)), 'data', config['exchange']['name']
+    )
+
+    if args.download_days:
+        download(args.config, pairs, base_timeframe, args.download_days)
+
+    print(f"{len(pairs)} pairs, {base_timeframe} -> {', '.join(informative_timeframes)}, "
+          f"{args.jobs} workers, {datadir}")
+    started = time.time()
+    reports = []
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        futures = {
+            pool.submit(prepare_pair, pair, datadir, trading_mode, base_timeframe, informative_timeframes,
+                        args.strategy_file, args.overwrite): pair
+            for pair in pairs
+        }
+        for future in as_completed(futures):
+            try:
+                reports.append(future.result())
+            except Exception as e:
+                reports.append({'pair': futures[future], 'error': str(e)})
+
+    print()
+    print(f"{'pair':<22} {'rows':>8} {'dups':>5} {'gaps':>5} {'missing':>8} {'largest gap':>16}  first -> last")
+    print('-' * 110)
+    failed = 0
+    for report in sorted(reports, key=lambda r: r['pair']):
+        if 'error' in report:
+            failed += 1
+            print(f"{report['pair']:<22} ERROR: {report['error']}")
+            continue
+        flags = ' (misaligned: %d)' % report['misaligned'] if report['misaligned'] else ''
+        if report['kept']:
+            flags += f" (kept existing: {', '.join(report['kept'])})"
+        print(
+            f"{report['pair']:<22} {report['rows']:>8} {report['duplicates']:>5} {report['gaps']:>5} "
+            f"{report['missing_candles']:>8} {report['largest_gap']:>16}  "
+            f"{report['first'][:16]} -> {report['last'][:16]}{flags}"
+        )
+    print()
+    print(f"Prepared {len(reports) - failed}/{len(pairs)} pairs in {time.time() - started:.1f}s. "
+          "Gaps are reported, not filled: backtesting fills them like live trading does.")
+    if any(report.get('kept') for report in reports):
+        print("Existing files were kept; rerun with --overwrite to replace them.")
+    sys.exit(1 if failed else 0)
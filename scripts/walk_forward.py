@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""
+Parallel walk-forward evaluation for FreqAi_NoTank4h
+Splits a timerange into rolling train/test windows and backtests every
+window × parameter set in a process pool. Indicators (FreqAI predictions
+included) are computed once, cached on disk and handed to the workers
+through shared memory; per-window metrics stream into a sqlite results
+table, so an interrupted run resumes with the jobs that are still missing.
+Run from the repository root inside the freqtrade environment.
+"""
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from freqtrade.commands.optimize_commands import setup_optimize_configuration
+from freqtrade.configuration import TimeRange
+from freqtrade.enums import RunMode
+from freqtrade.misc import pair_to_filename
+from freqtrade.optimize.backtesting import Backtesting
+from freqtrade.resolvers import StrategyResolver
+from freqtrade.strategy.parameters import BaseParameter
+
+RESULTS_SCHEMA = """
+-- One row per (window, parameter set, segment); segment is 'train' or 'test'
+CREATE TABLE IF NOT EXISTS results (
+    window TEXT NOT NULL,
+    param_set TEXT NOT NULL,
+    params_hash TEXT NOT NULL,
+    segment TEXT NOT NULL,
+    start TEXT NOT NULL,
+    end TEXT NOT NULL,
+    trades INTEGER NOT NULL,
+    profit_abs REAL NOT NULL,
+    profit_ratio REAL NOT NULL,
+    win_rate REAL NOT NULL,
+    max_drawdown_abs REAL NOT NULL,
+    seconds REAL NOT NULL,
+    finished_at TEXT NOT NULL,
+    PRIMARY KEY (window, param_set, params_hash, segment)
+);
+"""
+
+# Per worker process: the Backtesting instance, shared frames and baseline parameter values
+_worker = {}
+
+
+def load_config(config_paths, strategy, timerange):
+    config = setup_optimize_configuration(
+        {'config': config_paths, 'strategy': strategy, 'timerange': timerange}, RunMode.BACKTEST
+    )
+    config['export'] = 'none'
+    return config
+
+
+def split_windows(timerange, train_days, test_days, step_days, anchored=False):
+    """[(window id, train start, test start, test end)] covering the timerange"""
+    start = datetime.strptime(timerange.split('-')[0], '%Y%m%d').replace(tzinfo=timezone.utc)
+    end = datetime.strptime(timerange.split('-')[1], '%Y%m%d').replace(tzinfo=timezone.utc)
+    windows = []
+    test_start = start + timedelta(days=train_days)
+    while test_start + timedelta(days=test_days) <= end:
+        train_start = start if anchored else test_start - timedelta(days=train_days)
+        test_end = test_start + timedelta(days=test_days)
+        window = f"{train_start:%Y%m%d}-{test_start:%Y%m%d}-{test_end:%Y%m%d}"
+        windows.append((window, train_start, test_start, test_end))
+        test_start += timedelta(days=step_days)
+    return windows
+
+
+def load_param_sets(path):
+    """
+    [(name, params, hash)] from a JSON list of {"name": ..., "params": {...}}.
+    params may be flat or grouped by space like a strategy params file;
+    a 'default' set (the strategy as configured) is always included.
+    """
+    sets = [{'name': 'default', 'params': {}}]
+    if path:
+        with open(path, 'r') as f:
+            sets += [entry for entry in json.load(f) if entry.get('name') != 'default']
+    param_sets = []
+    for entry in sets:
+        params = {}
+        for key, value in entry.get('params', {}).items():
+            if isinstance(value, dict) and key not in ('minimal_roi', 'roi'):
+                params.update(value)
+            else:
+                params['minimal_roi' if key == 'roi' else key] = value
+        params_hash = hashlib.sha1(json.dumps(params, sort_keys=True).encode()).hexdigest()[:12]
+        param_sets.append((entry['name'], params, params_hash))
+    return param_sets
+
+
+def indicator_cache_dir(cache_root, config, timerange):
+    """Cache directory keyed by strategy source, timerange, pairs and FreqAI settings"""
+    strategy_path = config.get('strategy_path') or os.path.join(config['user_data_dir'], 'strategies')
+    strategy_file = os.path.join(strategy_path, f"{config['strategy']}.py")
+    digest = hashlib.sha1()
+    with open(strategy_file, 'rb') as f:
+        digest.update(f.read())
+    digest.update(json.dumps(
+        [timerange, config['timeframe'], sorted(config['exchange']['pair_whitelist']), config.get('freqai', {})],
+        sort_keys=True, default=str,
+    ).encode())
+    return os.path.join(cache_root, digest.hexdigest()[:16])
+
+
+def compute_indicators(config, cache_dir):
+    """{pair: analyzed DataFrame} for the whole timerange (plus startup), from cache when possible"""
+    manifest_path = os.path.join(cache_dir, 'manifest.json')
+    if os.path.exists(manifest_path):
+        with open(manifest_path, 'r') as f:
+            pairs = json.load(f)['pairs']
+        print(f"Indicators from cache {cache_dir}")
+        return {pair: pd.read_feather(os.path.join(cache_dir, f"{pair_to_filename(pair)}.feather")) for pair in pairs}
+
+    started = time.time()
+    backtesting = Backtesting(config)
+    data, _ = backtesting.load_bt_data()
+    processed = backtesting.strategy.advise_all_indicators(data)
+    print(f"Indicators for {len(processed)} pairs computed in {time.time() - started:.0f}s")
+    os.makedirs(cache_dir, exist_ok=True)
+    for pair, frame in processed.items():
+        frame.reset_index(drop=True).to_feather(
+            os.path.join(cache_dir, f"{pair_to_filename(pair)}.feather"), compression='uncompressed'
+        )
+    # Written last: a partial cache is never mistaken for a complete one
+    with open(manifest_path, 'w') as f:
+        json.dump({'pairs': list(processed)}, f)
+    return processed
+
+
+def share_frame(frame):
+    """Copy a DataFrame's numeric columns into one shared memory block; returns (block, spec)"""
+    columns, objects, offset = [], {}, 0
+    arrays = []
+    for column in frame.columns:
+        series = frame[column]
+        if column == 'date':
+            array = pd.to_datetime(series, utc=True).dt.tz_localize(None).to_numpy('datetime64[ns]').view('int64')
+        elif isinstance(series.dtype, np.dtype) and series.dtype.kind in 'biuf':
+            array = series.to_numpy()
+        else:
+            objects[column] = series.tolist()
+            continue
+        offset = -(-offset // 8) * 8
+        columns.append((column, array.dtype.str, offset))
+        arrays.append((offset, array))
+        offset += array.nbytes
+    block = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+    for start, array in arrays:
+        np.ndarray(array.shape, array.dtype, buffer=block.buf, offset=start)[:] = array
+    return block, {'name': block.name, 'rows': len(frame), 'columns': columns, 'objects': objects,
+                   'order': list(frame.columns)}
+
+
+def attach_frame(spec):
+    """Read-only DataFrame over a shared block, numeric columns are not copied; returns (block, dates, frame)"""
+    try:
+        block = shared_memory.SharedMemory(name=spec['name'], track=False)
+    except TypeError:
+        # Python < 3.13 always tracks; spawned workers share the owner's tracker, which unlinks once
+        block = shared_memory.SharedMemory(name=spec['name'])
+    arrays = {}
+    for column, dtype, offset in spec['columns']:
+        array = np.ndarray((spec['rows'],), np.dtype(dtype), buffer=block.buf, offset=offset)
+        array.flags.writeable = False
+        arrays[column] = array
+    dates = arrays['date']
+    columns = {
+        column: pd.to_datetime(dates, utc=True) if column == 'date'
+        else arrays[column] if column in arrays else spec['objects'][column]
+        for column in spec['order']
+    }
+    return block, dates, pd.DataFrame(columns, copy=False)
+
+
+def init_worker(config, specs):
+    backtesting = Backtesting(config)
+    backtesting.load_bt_data_detail()
+    frames = {}
+    for pair, spec in specs.items():
+        block, dates, frame = attach_frame(spec)
+        frames[pair] = (block, dates, frame)
+    strategy = backtesting.strategy
+    baseline = {
+        name: getattr(strategy, name).value
+        for name in dir(type(strategy)) if isinstance(getattr(type(strategy), name, None), BaseParameter)
+    }
+    _worker.update(config=config, backtesting=backtesting, frames=frames, baseline=baseline)
+
+
+def apply_params(strategy, params):
+    """Reset hyperopt parameters to the configured values, then apply the set's overrides"""
+    for name, value in {**_worker['baseline'], **params}.items():
+        attribute = getattr(strategy, name)
+        if isinstance(attribute, BaseParameter):
+            attribute.value = value
+        else:
+            setattr(strategy, name, value)
+
+
+def segment_metrics(results, starting_balance):
+    trades = results['results']
+    if trades.empty:
+        return {'trades': 0, 'profit_abs': 0.0, 'profit_ratio': 0.0, 'win_rate': 0.0, 'max_drawdown_abs': 0.0}
+    cumulative = trades.sort_values('close_date')['profit_abs'].cumsum()
+    return {
+        'trades': len(trades),
+        'profit_abs': float(trades['profit_abs'].sum()),
+        'profit_ratio': float(trades['profit_abs'].sum() / starting_balance),
+        'win_rate': float((trades['profit_abs'] > 0).mean()),
+        'max_drawdown_abs': float((cumulative.cummax().clip(lower=0) - cumulative).max()),
+    }
+
+
+def run_segment(start, end):
+    """Backtest the current strategy over [start, end) on the shared frames"""
+    backtesting = _worker['backtesting']
+    startup = backtesting.required_startup
+    processed = {}
+    for pair, (_, dates, frame) in _worker['frames'].items():
+        first = int(np.searchsorted(dates, pd.Timestamp(start).value))
+        last = int(np.searchsorted(dates, pd.Timestamp(end).value))
+        if last > first:
+            # Startup candles in front are trimmed again by the backtest itself
+            processed[pair] = frame.iloc[max(first - startup, 0):last]
+    backtesting.timerange = TimeRange('date', 'date', int(start.timestamp()), int(end.timestamp()))
+    started = time.time()
+    results = backtesting.backtest(processed=processed, start_date=start, end_date=end)
+    metrics = segment_metrics(results, _worker['config']['dry_run_wallet'])
+    metrics['seconds'] = time.time() - started
+    return metrics
+
+
+def run_job(window, train_start, test_start, test_end, name, params, params_hash):
+    """Train and test metrics of one parameter set in one window"""
+    backtesting = _worker['backtesting']
+    # Fresh strategy per job: DCA state and caches must not leak between runs
+    strategy = StrategyResolver.load_strategy(_worker['config'])
+    apply_params(strategy, params)
+    backtesting._set_strategy(strategy)
+    rows = []
+    for segment, start, end in (('train', train_start, test_start), ('test', test_start, test_end)):
+        metrics = run_segment(start, end)
+        rows.append({'window': window, 'param_set': name, 'params_hash': params_hash, 'segment': segment,
+                     'start': start.isoformat(), 'end': end.isoformat(), **metrics})
+    return rows
+
+
+def open_results(path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    store = sqlite3.connect(path)
+    store.executescript(RESULTS_SCHEMA)
+    return store
+
+
+def store_rows(store, rows):
+    finished_at = datetime.now(timezone.utc).isoformat()
+    with store:
+        store.executemany(
+            """INSERT OR REPLACE INTO results
+               (window, param_set, params_hash, segment, start, end, trades, profit_abs, profit_ratio,
+                win_rate, max_drawdown_abs, seconds, finished_at)
+               VALUES (:window, :param_set, :params_hash, :segment, :start, :end, :trades, :profit_abs,
+                       :profit_ratio, :win_rate, :max_drawdown_abs, :seconds, :finished_at)""",
+            [{**row, 'finished_at': finished_at} for row in rows],
+        )
+
+
+def report(store, windows, param_sets):
+    """Per window: the set with the best train profit and its out-of-sample result"""
+    results = pd.read_sql_query("SELECT * FROM results", store)
+    keys = {(name, params_hash) for name, _, params_hash in param_sets}
+    results = results[[key in keys for key in zip(results['param_set'], results['params_hash'])]]
+    results = results[results['window'].isin([window for window, *_ in windows])]
+    if results.empty:
+        print("No results yet")
+        return
+    train = results[results['segment'] == 'train']
+    test = results[results['segment'] == 'test'].set_index(['window', 'param_set'])
+
+    print(f"{'window':<28} {'selected':<20} {'train':>10} {'test':>10} {'trades':>7} {'test dd':>10}")
+    print('-' * 90)
+    out_of_sample = 0.0
+    for window, group in train.groupby('window'):
+        best = group.sort_values('profit_abs', ascending=False).iloc[0]
+        if (window, best['param_set']) not in test.index:
+            continue
+        chosen = test.loc[(window, best['param_set'])]
+        out_of_sample += chosen['profit_abs']
+        print(f"{window:<28} {best['param_set']:<20} {best['profit_abs']:>10.2f} {chosen['profit_abs']:>10.2f} "
+              f"{int(chosen['trades']):>7} {chosen['max_drawdown_abs']:>10.2f}")
+    print(f"\nWalk-forward out-of-sample profit: {out_of_sample:.2f}")
+
+    print(f"\n{'param set':<20} {'windows':>7} {'test profit':>12} {'test trades':>12} {'win rate':>9}")
+    print('-' * 64)
+    per_set = test.reset_index().groupby('param_set').agg(
+        windows=('window', 'count'), profit=('profit_abs', 'sum'), trades=('trades', 'sum'), win_rate=('win_rate', 'mean')
+    )
+    for name, row in per_set.sort_values('profit', ascending=False).iterrows():
+        print(f"{name:<20} {int(row['windows']):>7} {row['profit']:>12.2f} {int(row['trades']):>12} {row['win_rate']:>8.1%}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Parallel walk-forward evaluation of parameter sets')
+    parser.add_argument('--config', nargs='+', default=['user_data/config.json'])
+    parser.add_argument('--strategy', default='FreqAi_NoTank4h')
+    parser.add_argument('--timerange', required=True, help='YYYYMMDD-YYYYMMDD')
+    parser.add_argument('--train-days', type=int, default=90)
+    parser.add_argument('--test-days', type=int, default=30)
+    parser.add_argument('--step-days', type=int, help='default: --test-days')
+    parser.add_argument('--anchored', action='store_true', help='train windows always start at the timerange start')
+    parser.add_argument('--param-sets', help='JSON list of {"name": ..., "params": {...}}')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(), help='worker processes')
+    parser.add_argument('--results', default='user_data/backtest_results/walk_forward.sqlite')
+    parser.add_argument('--cache-dir', default='user_data/backtest_results/walk_forward_cache')
+    parser.add_argument('--report-only', action='store_true')
+    args = parser.parse_args()
+
+    windows = split_windows(args.timerange, args.train_days, args.test_days, args.step_days or args.test_days,
+                            args.anchored)
+    param_sets = load_param_sets(args.param_sets)
+    store = open_results(args.results)
+    if args.report_only:
+        report(store, windows, param_sets)
+        raise SystemExit(0)
+
+    done = set(store.execute(
+        "SELECT window, param_set, params_hash FROM results GROUP BY 1, 2, 3 HAVING COUNT(*) = 2"
+    ).fetchall())
+    jobs = [
+        (window, train_start, test_start, test_end, name, params, params_hash)
+        for window, train_start, test_start, test_end in windows
+        for name, params, params_hash in param_sets
+        if (window, name, params_hash) not in done
+    ]
+    total = len(windows) * len(param_sets)
+    print(f"{len(windows)} windows × {len(param_sets)} parameter sets: {total - len(jobs)} done, "
+          f"{len(jobs)} to run on {args.jobs} workers")
+
+    if jobs:
+        config = load_config(args.config, args.strategy, args.timerange)
+        processed = compute_indicators(config, indicator_cache_dir(args.cache_dir, config, args.timerange))
+        blocks, specs = [], {}
+        for pair in list(processed):
+            block, specs[pair] = share_frame(processed.pop(pair))
+            blocks.append(block)
+        started = time.time()
+        try:
+            # spawn: workers start clean instead of forking freqtrade's threads and the parent's frames
+            with ProcessPoolExecutor(max_workers=args.jobs, mp_context=multiprocessing.get_context('spawn'),
+                                     initializer=init_worker, initargs=(config, specs)) as pool:
+                futures = {pool.submit(run_job, *job): job for job in jobs}
+                for finished, future in enumerate(as_completed(futures), 1):
+                    window, *_, name, _, _ = futures[future]
+                    try:
+                        rows = future.result()
+                    except Exception as e:
+                        print(f"[{finished}/{len(jobs)}] {window} {name} failed: {e}")
+                        continue
+                    store_rows(store, rows)
+                    print(f"[{finished}/{len(jobs)}] {window} {name}: train {rows[0]['profit_abs']:.2f}, "
+                          f"test {rows[1]['profit_abs']:.2f} ({time.time() - started:.0f}s)")
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+    print()
+    report(store, windows, param_sets)
@@ -1,10 +1,28 @@
+import atexit
+import hashlib
+import heapq
 import logging
+import mmap
 import os
+import queue
+import socket
+import struct
+import sys
+import threading
+import time
 import warnings
+from abc import ABC, abstractmethod
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
 from datetime import datetime, timezone
 import json
 from pathlib import Path
 
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
 warnings.filterwarnings('ignore')
 
 logger = logging.getLogger(__name__)
@@ -12,12 +30,12 @@ import talib.abstract as ta
 
 import numpy as np
 from pandas import DataFrame
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
+from freqtrade.exchange import timeframe_to_minutes
 from freqtrade.persistence import Trade
 import requests
 from freqtrade.strategy import (
     IStrategy,
-    informative,  # @informative decorator
     # Hyperopt Parameters
     BooleanParameter,
     DecimalParameter,
@@ -30,6 +48,802 @@ import pandas as pd
 warnings.simplefilter(action="ignore", category=pd.errors.PerformanceWarning)
 
 
+class DCAExpiryScheduler:
+    """
+    Min-heap of (deadline, seq, trade_id, event) keyed by UTC epoch seconds.
+    Entries are never removed early: events for requests that were already
+    answered are simply ignored when they come due.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[float, int, int, str]] = []
+        self._seq = 0
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def schedule(self, deadline: float, trade_id: int, event: str) -> None:
+        self._seq += 1
+        heapq.heappush(self._heap, (deadline, self._seq, trade_id, event))
+
+    def pop_due(self, now: float) -> List[Tuple[int, str]]:
+        """Remove and return (trade_id, event) for every deadline <= now"""
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            _, _, trade_id, event = heapq.heappop(self._heap)
+            due.append((trade_id, event))
+        return due
+
+
+class DCARequest:
+    """State of one trade's outstanding DCA confirmation request"""
+
+    __slots__ = ("trade_id", "dca_id", "status", "requested_at", "updated_at", "message")
+
+    def __init__(self, trade_id: int, dca_id: str, status: int, now: float, message: Optional[dict] = None):
+        self.trade_id = trade_id
+        self.dca_id = dca_id
+        self.status = status
+        self.requested_at = now
+        self.updated_at = now
+        self.message = message
+
+
+class DCAStateStore:
+    """
+    Bounded store of DCA requests and decisions, one record per trade id (a
+    trade only ever waits on its next safety order). Records are kept in
+    update order: anything not updated for `ttl` seconds, or beyond
+    `capacity`, is evicted from the front, and closed trades are discarded
+    explicitly. Decisions pushed for ids this process never requested (e.g.
+    after a restart) wait in a bounded side map until the trade asks for them.
+    Thread-safe: the decision listener writes from its own thread.
+    """
+
+    PENDING, CONFIRMED, DECLINED = 0, 1, 2
+
+    def __init__(self, capacity: int = 1024, ttl: float = 3600.0):
+        self.capacity = max(1, capacity)
+        self.ttl = ttl
+        self._records: "OrderedDict[int, DCARequest]" = OrderedDict()
+        self._by_dca_id: Dict[str, int] = {}
+        self._unmatched: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def _touch(self, record: DCARequest, now: float) -> None:
+        record.updated_at = now
+        self._records.move_to_end(record.trade_id)
+
+    def _drop(self, trade_id: int) -> Optional[DCARequest]:
+        record = self._records.pop(trade_id, None)
+        if record is not None and self._by_dca_id.get(record.dca_id) == trade_id:
+            del self._by_dca_id[record.dca_id]
+        return record
+
+    def _insert(self, record: DCARequest) -> DCARequest:
+        self._drop(record.trade_id)
+        self._records[record.trade_id] = record
+        self._by_dca_id[record.dca_id] = record.trade_id
+        while len(self._records) > self.capacity:
+            self._drop(next(iter(self._records)))
+        return record
+
+    def lookup(self, trade_id: int, dca_id: str) -> Optional[DCARequest]:
+        """The trade's record for request `dca_id`, adopting a decision that arrived first"""
+        with self._lock:
+            record = self._records.get(trade_id)
+            if record is not None and record.dca_id == dca_id:
+                return record
+            decision = self._unmatched.pop(dca_id, None)
+            if decision is None:
+                return None
+            status, decided_at = decision
+            return self._insert(DCARequest(trade_id, dca_id, status, decided_at))
+
+    def get(self, trade_id: int) -> Optional[DCARequest]:
+        with self._lock:
+            return self._records.get(trade_id)
+
+    def request(self, trade_id: int, dca_id: str, now: float, message: Optional[dict] = None) -> DCARequest:
+        """Record a confirmation request that was just sent"""
+        with self._lock:
+            return self._insert(DCARequest(trade_id, dca_id, self.PENDING, now, message))
+
+    def decide(self, dca_id: str, status: int, now: float) -> Optional[DCARequest]:
+        """
+        Record a decision; returns the matching record, or None if it was kept
+        aside. The first decision for a request is final, later ones are ignored.
+        """
+        with self._lock:
+            trade_id = self._by_dca_id.get(dca_id)
+            if trade_id is None:
+                if dca_id not in self._unmatched:
+                    self._unmatched[dca_id] = (status, now)
+                    while len(self._unmatched) > self.capacity:
+                        self._unmatched.popitem(last=False)
+                return None
+            record = self._records[trade_id]
+            if record.status != self.PENDING:
+                return record
+            record.status = status
+            self._touch(record, now)
+            return record
+
+    def discard(self, trade_id: int) -> None:
+        """Forget a trade's request, e.g. once its DCA executed or the trade closed"""
+        with self._lock:
+            self._drop(trade_id)
+
+    def expire(self, now: float) -> int:
+        """Evict records and side decisions not updated within ttl; returns the count"""
+        cutoff = now - self.ttl
+        evicted = 0
+        with self._lock:
+            while self._records:
+                record = next(iter(self._records.values()))
+                if record.updated_at > cutoff:
+                    break
+                self._drop(record.trade_id)
+                evicted += 1
+            while self._unmatched and next(iter(self._unmatched.values()))[1] <= cutoff:
+                self._unmatched.popitem(last=False)
+                evicted += 1
+        return evicted
+
+
+def safety_order_ladder(initial_trigger, step_scale, volume_scale, max_orders, safety_budget=0.7 / 0.3):
+    """
+    Geometric safety-order ladder. Returns (triggers, multipliers), each shaped
+    (..., max(max_orders)): triggers[n] is the price deviation from the first
+    entry at which safety order n + 1 fires, multipliers[n] its stake as a
+    multiple of the first entry stake, the whole ladder summing to
+    safety_budget. Parameters broadcast, so arrays of parameter sets are
+    evaluated at once; levels beyond a set's max_orders are NaN.
+    """
+    initial_trigger, step_scale, volume_scale, max_orders = np.broadcast_arrays(
+        *(np.asarray(value, dtype=float) for value in (initial_trigger, step_scale, volume_scale, max_orders))
+    )
+    level = np.arange(int(max_orders.max()))
+    valid = level < max_orders[..., None]
+
+    # Deviation of order n = initial * (1 + step + ... + step^n)
+    triggers = initial_trigger[..., None] * np.cumsum(step_scale[..., None] ** level, axis=-1)
+    volumes = np.where(valid, volume_scale[..., None] ** level, 0.0)
+    multipliers = safety_budget * volumes / volumes.sum(axis=-1, keepdims=True)
+    return np.where(valid, triggers, np.nan), np.where(valid, multipliers, np.nan)
+
+
+class DCAPlan:
+    """
+    Everything adjust_trade_position needs for one trade between two fills:
+    the next safety order (id, number, stake, profit trigger) and the next
+    partial exit (profit trigger, stake to sell). None disables a step.
+    """
+
+    __slots__ = (
+        "entries", "exits", "dca_order_id", "dca_order_number", "dca_stake",
+        "dca_trigger", "exit_trigger", "exit_stake",
+    )
+
+    def __init__(self, entries: int, exits: int, dca_order_id: Optional[str], dca_stake: Optional[float],
+                 dca_trigger: Optional[float], exit_trigger: Optional[float], exit_stake: Optional[float]):
+        self.entries = entries
+        self.exits = exits
+        self.dca_order_id = dca_order_id
+        self.dca_order_number = entries + 1
+        self.dca_stake = dca_stake
+        self.dca_trigger = dca_trigger
+        self.exit_trigger = exit_trigger
+        self.exit_stake = exit_stake
+
+
+class DCADecisionPolicy(ABC):
+    """Simulated user response to DCA confirmation requests (backtest/hyperopt)"""
+
+    @abstractmethod
+    def decide(self, dca_order_id: str) -> Tuple[bool, float]:
+        """Return (accept, seconds until the simulated click)"""
+
+    def __repr__(self) -> str:
+        return self.__class__.__name__
+
+
+class AcceptAllPolicy(DCADecisionPolicy):
+    def __init__(self, delay_seconds: float = 0.0):
+        self.delay_seconds = delay_seconds
+
+    def decide(self, dca_order_id: str) -> Tuple[bool, float]:
+        return True, self.delay_seconds
+
+
+class DeclineAllPolicy(DCADecisionPolicy):
+    def decide(self, dca_order_id: str) -> Tuple[bool, float]:
+        return False, 0.0
+
+
+class ProbabilisticPolicy(DCADecisionPolicy):
+    """Accept with probability p; the draw is a hash of (seed, id), so runs are reproducible"""
+
+    def __init__(self, probability: float, delay_seconds: float = 0.0, seed: int = 0):
+        self.probability = probability
+        self.delay_seconds = delay_seconds
+        self.seed = seed
+
+    def decide(self, dca_order_id: str) -> Tuple[bool, float]:
+        digest = hashlib.blake2b(f"{self.seed}:{dca_order_id}".encode(), digest_size=8).digest()
+        draw = int.from_bytes(digest, "big") / 2 ** 64
+        return draw < self.probability, self.delay_seconds
+
+    def __repr__(self) -> str:
+        return f"ProbabilisticPolicy(p={self.probability}, delay={self.delay_seconds}s, seed={self.seed})"
+
+
+class ReplayPolicy(DCADecisionPolicy):
+    """Replay live decisions (and their response times) recorded in the DCA trace log"""
+
+    def __init__(self, decisions: Dict[str, Tuple[bool, float]], fallback: DCADecisionPolicy):
+        self.decisions = decisions
+        self.fallback = fallback
+
+    @classmethod
+    def from_trace(cls, path: str, fallback: DCADecisionPolicy) -> "ReplayPolicy":
+        requested: Dict[str, float] = {}
+        decided: Dict[str, Tuple[bool, float]] = {}
+        try:
+            with open(path, "r") as f:
+                for line in f:
+                    try:
+                        span = json.loads(line)
+                    except ValueError:
+                        continue
+                    dca_id = span.get("dca_id")
+                    if span.get("stage") == "requested":
+                        requested.setdefault(dca_id, span["ts"])
+                    elif span.get("stage") == "decided" and dca_id not in decided:
+                        decided[dca_id] = (span.get("action") == "accept", span["ts"])
+        except OSError as e:
+            logger.warning(f"Cannot read DCA replay file {path}: {e}")
+        decisions = {
+            dca_id: (accept, max(0.0, ts - requested.get(dca_id, ts)))
+            for dca_id, (accept, ts) in decided.items()
+        }
+        return cls(decisions, fallback)
+
+    def decide(self, dca_order_id: str) -> Tuple[bool, float]:
+        if dca_order_id in self.decisions:
+            return self.decisions[dca_order_id]
+        return self.fallback.decide(dca_order_id)
+
+    def __repr__(self) -> str:
+        return f"ReplayPolicy({len(self.decisions)} decisions, fallback={self.fallback!r})"
+
+
+def build_dca_policy(settings: dict) -> DCADecisionPolicy:
+    """
+    Build the backtest confirmation policy from the `dca_backtest_policy`
+    config section: {"mode": "accept" | "decline" | "probability" | "replay",
+    "probability": 0.7, "delay_minutes": 2, "seed": 42, "replay_file": "...",
+    "fallback": "accept"}
+    """
+    mode = settings.get("mode", "accept")
+    delay_seconds = float(settings.get("delay_minutes", 0)) * 60
+    if mode == "decline":
+        return DeclineAllPolicy()
+    if mode == "probability":
+        return ProbabilisticPolicy(
+            float(settings.get("probability", 0.5)), delay_seconds, int(settings.get("seed", 0))
+        )
+    if mode == "replay":
+        fallback = build_dca_policy({**settings, "mode": settings.get("fallback", "accept")})
+        path = settings.get("replay_file", "user_data/dca_trace.jsonl")
+        return ReplayPolicy.from_trace(path, fallback)
+    return AcceptAllPolicy(delay_seconds)
+
+
+OHLCV_COLUMNS = ["date", "open", "high", "low", "close", "volume"]
+
+
+def resample_ohlcv(dataframe: DataFrame, minutes: int, base_minutes: int) -> DataFrame:
+    """Aggregate base candles into epoch-aligned `minutes` candles, keeping only complete ones"""
+    if dataframe.empty:
+        return dataframe[OHLCV_COLUMNS].iloc[0:0]
+    resampled = dataframe[OHLCV_COLUMNS].set_index("date").resample(
+        f"{minutes}min", origin="epoch", label="left", closed="left"
+    ).agg({"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"})
+    # Complete = the first and the closing base candle of the bucket are both present
+    first_base, last_base = dataframe["date"].iloc[0], dataframe["date"].iloc[-1]
+    complete = (resampled.index >= first_base) & (
+        resampled.index + pd.Timedelta(minutes=minutes - base_minutes) <= last_base
+    )
+    return resampled[complete].dropna(subset=["open"]).reset_index()
+
+
+class InformativeResampler:
+    """
+    Higher-timeframe candles built from the base timeframe the bot already
+    downloads. Completed candles are cached per (pair, timeframe) and extended
+    incrementally, so history keeps growing past the base window. Pairs with
+    too little history are seeded once from exchange data; until that data is
+    available they are listed in needs_exchange for informative_pairs.
+    Without `cache` (backtests) the whole base frame is resampled every call.
+    """
+
+    def __init__(self, base_timeframe: str, min_candles: int, max_candles: int, cache: bool = True):
+        self.base_minutes = timeframe_to_minutes(base_timeframe)
+        self.min_candles = min_candles
+        self.max_candles = max_candles
+        self.cache = cache
+        self.needs_exchange = set()
+        self._frames: Dict[Tuple[str, str], DataFrame] = {}
+
+    def get(self, pair: str, timeframe: str, base: DataFrame, dp) -> DataFrame:
+        key = (pair, timeframe)
+        minutes = timeframe_to_minutes(timeframe)
+        if not self.cache:
+            return resample_ohlcv(base, minutes, self.base_minutes)
+        frame = self._frames.get(key)
+        if frame is not None and len(frame) and len(base) and base["date"].iloc[0] < frame["date"].iloc[0]:
+            # Base reaches further back than the cache: appending would leave that history out
+            frame = None
+        if frame is not None and len(frame):
+            next_start = frame["date"].iloc[-1] + pd.Timedelta(minutes=minutes)
+            if len(base) and base["date"].iloc[0] <= next_start:
+                new = resample_ohlcv(base[base["date"] >= next_start], minutes, self.base_minutes)
+                frame = pd.concat([frame, new], ignore_index=True)
+            else:
+                # Base window no longer overlaps the cache (bot was down): rebuild
+                frame = None
+        if frame is None or not len(frame):
+            frame = resample_ohlcv(base, minutes, self.base_minutes)
+
+        if len(frame) < self.min_candles:
+            exchange = dp.get_pair_dataframe(pair=pair, timeframe=timeframe) if dp else None
+            if exchange is not None and len(exchange):
+                older = exchange[OHLCV_COLUMNS]
+                if len(frame):
+                    older = older[older["date"] < frame["date"].iloc[0]]
+                frame = pd.concat([older, frame], ignore_index=True)
+                self.needs_exchange.discard(key)
+            else:
+                self.needs_exchange.add(key)
+
+        frame = frame.iloc[-self.max_candles:].reset_index(drop=True)
+        self._frames[key] = frame
+        return frame.copy()
+
+
+class InformativeIndex:
+    """
+    Per (pair, timeframe) map from base rows to informative rows, matching
+    merge_informative_pair(ffill=True): an informative candle lands on the
+    base row dated its close minus one base candle and is carried forward.
+    The map holds the carried informative date per base row; with `cache`
+    (live runs) it is kept and, when the base window slides, extended from
+    the last carried candle instead of being rebuilt. attach() turns it into
+    a single row gather.
+    """
+
+    NONE = np.iinfo(np.int64).min
+
+    def __init__(self, base_timeframe: str, cache: bool = True):
+        self.base_minutes = timeframe_to_minutes(base_timeframe)
+        self.cache = cache
+        self._maps: Dict[Tuple[str, str], Tuple[np.ndarray, np.ndarray, int]] = {}
+
+    def _carry(self, base_dates: np.ndarray, merge_dates: np.ndarray, start: int) -> np.ndarray:
+        pos = np.searchsorted(base_dates, merge_dates)
+        hit = pos < len(base_dates)
+        hit[hit] = base_dates[pos[hit]] == merge_dates[hit]
+        carried = np.full(len(base_dates), self.NONE, dtype=np.int64)
+        carried[pos[hit]] = merge_dates[hit]
+        if len(carried):
+            carried[0] = max(carried[0], start)
+        return np.maximum.accumulate(carried)
+
+    def carried_dates(self, key: Tuple[str, str], base_dates: np.ndarray, merge_dates: np.ndarray) -> np.ndarray:
+        """Merge date of the informative candle carried on each base row (NONE before the first)"""
+        carried = None
+        cached = self._maps.get(key)
+        if cached is not None and len(base_dates) and len(merge_dates):
+            old_base, old_carried, old_first = cached
+            shift = int(np.searchsorted(old_base, base_dates[0]))
+            overlap = len(old_base) - shift
+            reusable = (
+                0 < overlap <= len(base_dates)
+                and old_base[shift] == base_dates[0] and old_base[-1] == base_dates[overlap - 1]
+                # Older informative candles could match rows that had none
+                and merge_dates[0] >= old_first
+            )
+            if reusable:
+                # Redo the tail from the base row that picked up the last carried candle,
+                # so an informative candle that arrived late is still placed
+                redo = int(np.searchsorted(base_dates, old_carried[-1]))
+                redo = max(1, min(redo, overlap))
+                tail = self._carry(base_dates[redo:], merge_dates, old_carried[shift + redo - 1])
+                carried = np.concatenate([old_carried[shift:shift + redo], tail])
+                # Candles matched before the window start, or trimmed since, are not carried in
+                carried[:np.searchsorted(carried, max(base_dates[0], merge_dates[0]))] = self.NONE
+        if carried is None:
+            carried = self._carry(base_dates, merge_dates, self.NONE)
+        if self.cache:
+            self._maps[key] = (base_dates, carried, merge_dates[0] if len(merge_dates) else self.NONE)
+        return carried
+
+    def attach(self, pair: str, dataframe: DataFrame, informative: DataFrame, timeframe: str) -> DataFrame:
+        """Informative columns suffixed with the timeframe, aligned to the dataframe's rows"""
+        minutes = timeframe_to_minutes(timeframe)
+        base_dates = dataframe["date"].to_numpy(dtype="datetime64[ns]").view(np.int64)
+        merge_dates = (
+            informative["date"] + pd.Timedelta(minutes=minutes - self.base_minutes)
+        ).to_numpy(dtype="datetime64[ns]").view(np.int64)
+        carried = self.carried_dates((pair, timeframe), base_dates, merge_dates)
+
+        valid = carried != self.NONE
+        runs = np.flatnonzero(valid & np.r_[True, carried[1:] != carried[:-1]])
+        matched = carried[runs]
+        source = informative.iloc[np.searchsorted(merge_dates, matched)].reset_index(drop=True)
+        rows = np.searchsorted(matched, carried)
+        if not valid.all():
+            # Trailing all-NaN row (upcast as the merge would) for rows before the first candle
+            source = source.reindex(range(len(source) + 1))
+            rows[~valid] = len(source) - 1
+        gathered = source.take(rows)
+        gathered.columns = [f"{column}_{timeframe}" for column in source.columns]
+        gathered.index = dataframe.index
+        return gathered
+
+
+# Candles recomputed ahead of the first new one (RSI/DI warm-up, rolling windows)
+# RSI and DI use Wilder smoothing, so a resumed tail only approximates the full-history
+# value: the start-up difference decays as (13/14)^300 and stays below 1e-6 RSI/DI points
+FEATURE_LOOKBACK = 300
+# Trailing candles that can still change when new ones close (extrema order 5 + 4-candle checks)
+FEATURE_UNSETTLED = 10
+# Bump when local_features changes so old checkpoints are ignored
+FEATURE_VERSION = 1
+
+
+def local_features(dataframe: DataFrame) -> DataFrame:
+    """Features that only depend on nearby candles, so a tail window can be recomputed alone"""
+    features = DataFrame(index=dataframe.index)
+    features["rsi"] = ta.RSI(dataframe)
+    features["DI_values"] = ta.PLUS_DI(dataframe) - ta.MINUS_DI(dataframe)
+
+    close = dataframe["close"].values
+    min_peaks = argrelextrema(close, np.less, order=5)[0]
+    max_peaks = argrelextrema(close, np.greater, order=5)[0]
+    maxima = np.zeros(len(dataframe))
+    minima = np.zeros(len(dataframe))
+    extrema = np.zeros(len(dataframe), dtype=int)
+    maxima[max_peaks] = 1
+    minima[min_peaks] = 1
+    extrema[min_peaks] = -1
+    extrema[max_peaks] = 1
+    features["maxima"] = maxima
+    features["minima"] = minima
+    features["&s-extrema"] = extrema
+
+    features["maxima_check"] = (
+        features["maxima"].rolling(4).apply(lambda x: int((x != 1).all()), raw=True).fillna(0)
+    )
+    features["minima_check"] = (
+        features["minima"].rolling(4).apply(lambda x: int((x != 1).all()), raw=True).fillna(0)
+    )
+    return features
+
+
+def window_features(dataframe: DataFrame, features: DataFrame) -> DataFrame:
+    """Add the features accumulated from the first candle of the frame (MML levels, threshold means)"""
+    features = features.copy()
+    features["DI_cutoff"] = 0
+    for level, value in calculate_murrey_math_levels(dataframe).items():
+        features[level] = value
+    features["mmlextreme_oscillator"] = 100 * (
+            (dataframe["close"] - features["[4/8]P"])
+            / (features["[+3/8]P"] - features["[-3/8]P"])
+    )
+    features["DI_catch"] = np.where(features["DI_values"] > features["DI_cutoff"], 0, 1)
+    features["minima_sort_threshold"] = dataframe["close"].rolling(window=10).min()
+    features["maxima_sort_threshold"] = dataframe["close"].rolling(window=10).max()
+    features["min_threshold_mean"] = features["minima_sort_threshold"].expanding().mean()
+    features["max_threshold_mean"] = features["maxima_sort_threshold"].expanding().mean()
+    return features
+
+
+def extrema_features(dataframe: DataFrame) -> DataFrame:
+    return window_features(dataframe, local_features(dataframe))
+
+
+class IndicatorCheckpoint:
+    """
+    Local feature rows per (pair, timeframe), kept in memory and saved under
+    user_data after a full computation, then every `save_every` new candles
+    and at exit. On the next candle, or after a restart, rows whose OHLCV
+    still matches are reused and only the unsettled tail and new candles are
+    recomputed (with FEATURE_LOOKBACK candles of warm-up), so an older
+    checkpoint only means a longer tail. Window features are cheap and always
+    rebuilt over the whole frame.
+    """
+
+    def __init__(self, directory: Path, save_every: int = 16):
+        self.directory = directory
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.save_every = max(1, save_every)
+        self._frames: Dict[Tuple[str, str], DataFrame] = {}
+        # Candles computed since the last save, per key
+        self._unsaved: Dict[Tuple[str, str], int] = {}
+        atexit.register(self.flush)
+
+    def _path(self, pair: str, timeframe: str) -> Path:
+        name = pair.replace("/", "_").replace(":", "_")
+        return self.directory / f"{name}-{timeframe}-v{FEATURE_VERSION}.feather"
+
+    def _load(self, pair: str, timeframe: str) -> Optional[DataFrame]:
+        path = self._path(pair, timeframe)
+        if not path.exists():
+            return None
+        try:
+            return pd.read_feather(path)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable indicator checkpoint {path.name}: {e}")
+            return None
+
+    def _save(self, pair: str, timeframe: str, frame: DataFrame) -> None:
+        path = self._path(pair, timeframe)
+        tmp_path = path.with_suffix(".tmp")
+        try:
+            frame.to_feather(tmp_path)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Failed to save indicator checkpoint {path.name}: {e}")
+
+    def _resume(self, cached: DataFrame, ohlcv: DataFrame) -> Optional[DataFrame]:
+        """Local features for ohlcv reusing cached settled rows, or None if they don't line up"""
+        settled = cached.iloc[:-FEATURE_UNSETTLED]
+        if not len(ohlcv) or not len(settled):
+            return None
+        reused = settled[settled["date"] >= ohlcv["date"].iloc[0]]
+        reused_count = len(reused)
+        if not reused_count or reused_count > len(ohlcv):
+            return None
+        # Same candles, same prices: otherwise the exchange data changed under us
+        fresh = ohlcv.iloc[:reused_count]
+        if not np.array_equal(fresh["date"].values, reused["date"].values):
+            return None
+        prices = OHLCV_COLUMNS[1:]
+        if not np.allclose(fresh[prices].to_numpy(float), reused[prices].to_numpy(float), equal_nan=True):
+            return None
+
+        window_start = max(0, reused_count - FEATURE_LOOKBACK)
+        tail = local_features(ohlcv.iloc[window_start:])
+        return pd.concat(
+            [reused[tail.columns], tail.iloc[reused_count - window_start:]], ignore_index=True
+        )
+
+    def features(self, pair: str, timeframe: str, dataframe: DataFrame) -> DataFrame:
+        """All features for dataframe, positionally aligned with it"""
+        key = (pair, timeframe)
+        cached = self._frames.get(key)
+        if cached is None:
+            cached = self._load(pair, timeframe)
+        ohlcv = dataframe[OHLCV_COLUMNS].reset_index(drop=True)
+        if cached is not None and cached[OHLCV_COLUMNS].equals(ohlcv):
+            # No new candle for this timeframe (e.g. 1h/4h between closes)
+            local = cached.drop(columns=OHLCV_COLUMNS)
+        else:
+            local = self._resume(cached, ohlcv) if cached is not None else None
+            unsaved = self._unsaved.get(key, 0) + 1
+            if local is None:
+                local = local_features(ohlcv)
+                # Full recompute: the expensive case a restart should not repeat
+                unsaved = self.save_every
+            cached = pd.concat([ohlcv, local], axis=1)
+            if unsaved >= self.save_every:
+                self._save(pair, timeframe, cached)
+                self._unsaved.pop(key, None)
+            else:
+                self._unsaved[key] = unsaved
+        self._frames[key] = cached
+        return window_features(ohlcv, local)
+
+    def flush(self) -> None:
+        """Save every frame with candles not yet on disk (called at exit)"""
+        for pair, timeframe in list(self._unsaved):
+            self._save(pair, timeframe, self._frames[(pair, timeframe)])
+        self._unsaved.clear()
+
+
+class IndicatorSnapshot:
+    """
+    Fixed-layout memory-mapped file with the latest indicators and signals per
+    pair, for sidecars (webhook, monitor) that can't see market state. The
+    header's sequence counter is odd while a record is being rewritten.
+    Layout is mirrored by docker/dca_snapshot.py.
+    """
+
+    MAGIC = b"DCASNAP1"
+    VERSION = 1
+    # magic, version, record size, capacity, count, seq, updated_at
+    HEADER = struct.Struct("<8sIIIIQd")
+    HEADER_SIZE = 64
+    # pair, candle date, close, rsi, DI_values, mmlextreme_oscillator, rsi_1h, rsi_4h, 5 signal flags
+    RECORD = struct.Struct("<32sddddddd5b3x")
+    VALUE_COLUMNS = ("close", "rsi", "DI_values", "mmlextreme_oscillator", "rsi_1h", "rsi_4h")
+    SIGNAL_COLUMNS = ("&s-extrema", "enter_long", "enter_short", "exit_long", "exit_short")
+
+    def __init__(self, path: str, capacity: int = 128):
+        self.capacity = capacity
+        self._slots: Dict[str, int] = {}
+        self._seq = 0
+        size = self.HEADER_SIZE + capacity * self.RECORD.size
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            # Resize in place (never truncate to 0) so mapped readers don't fault
+            os.ftruncate(fd, size)
+            self._map = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+        # Continue a previous run's counter (never reuse a value a reader may hold) and clear
+        # its records inside an odd/even pair, as publish() does, so no torn record is accepted
+        magic, _, _, _, _, seq, _ = self.HEADER.unpack_from(self._map, 0)
+        if magic == self.MAGIC:
+            self._seq = seq + seq % 2
+        self._seq += 1
+        self._write_header()
+        self._map[self.HEADER_SIZE:] = bytes(size - self.HEADER_SIZE)
+        self._seq += 1
+        self._write_header()
+
+    def _write_header(self) -> None:
+        self.HEADER.pack_into(
+            self._map, 0, self.MAGIC, self.VERSION, self.RECORD.size, self.capacity,
+            len(self._slots), self._seq, time.time(),
+        )
+
+    def publish(self, pair: str, dataframe: DataFrame) -> None:
+        """Write the last row of an analyzed dataframe into the pair's record"""
+        if dataframe.empty:
+            return
+        slot = self._slots.get(pair)
+        if slot is None:
+            if len(self._slots) >= self.capacity:
+                return
+            slot = len(self._slots)
+        last = dataframe.iloc[-1]
+        values = [float(last.get(column, np.nan)) for column in self.VALUE_COLUMNS]
+        signals = [int(last.get(column, 0) == 1) for column in self.SIGNAL_COLUMNS[1:]]
+        extrema = last.get("&s-extrema", 0)
+        signals.insert(0, int(extrema) if extrema in (-1, 0, 1) else 0)
+
+        self._seq += 1
+        self._write_header()
+        self.RECORD.pack_into(
+            self._map, self.HEADER_SIZE + slot * self.RECORD.size,
+            pair.encode()[:32], last["date"].timestamp(), *values, *signals,
+        )
+        self._slots[pair] = slot
+        self._seq += 1
+        self._write_header()
+
+
+class LoopProfiler:
+    """
+    Sampling profiler for bot loop iterations. Every `every`-th iteration a
+    daemon thread samples the loop thread's Python stack every `interval`
+    seconds until the iteration is back in freqtrade's throttle sleep, then
+    writes the folded stacks (flamegraph.pl / speedscope input) and a text
+    summary to `directory`, keeping the newest `keep` profiles. The pair being
+    worked on, taken from the sampled frames' locals, is the root frame.
+    Nothing runs between profiled iterations.
+    """
+
+    # Innermost frames of freqtrade's Worker while it sleeps between iterations
+    IDLE_FRAMES = ("_throttle", "_sleep")
+
+    def __init__(self, directory: Path, every: int, interval: float = 0.005, keep: int = 20,
+                 throttle_secs: float = 5.0, max_seconds: float = 600.0):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.every = max(1, every)
+        self.interval = interval
+        self.keep = keep
+        self.throttle_secs = throttle_secs
+        self.max_seconds = max_seconds
+        self._iteration = 0
+        self._stop: Optional[threading.Event] = None
+
+    def loop_start(self) -> None:
+        """Called from bot_loop_start; starts sampling this iteration if it is due"""
+        self._iteration += 1
+        if self._stop is not None:
+            self._stop.set()
+            self._stop = None
+        if self._iteration % self.every:
+            return
+        self._stop = threading.Event()
+        threading.Thread(
+            target=self._sample, args=(threading.get_ident(), self._iteration, self._stop),
+            daemon=True, name="loop-profiler",
+        ).start()
+
+    @staticmethod
+    def _frame_pair(frame) -> Optional[str]:
+        names = frame.f_code.co_varnames
+        if "metadata" not in names and "trade" not in names and "pair" not in names:
+            return None
+        local = frame.f_locals
+        metadata, trade, pair = local.get("metadata"), local.get("trade"), local.get("pair")
+        if isinstance(metadata, dict) and metadata.get("pair"):
+            return metadata["pair"]
+        if getattr(trade, "pair", None):
+            return trade.pair
+        return pair if isinstance(pair, str) else None
+
+    def _sample(self, thread_id: int, iteration: int, stop: threading.Event) -> None:
+        stacks: Counter = Counter()
+        started = time.time()
+        while not stop.wait(self.interval) and time.time() - started < self.max_seconds:
+            frame = sys._current_frames().get(thread_id)
+            if frame is None:
+                break
+            if frame.f_code.co_name in self.IDLE_FRAMES and frame.f_code.co_filename.endswith("worker.py"):
+                break
+            labels, pair = [], None
+            while frame is not None:
+                code = frame.f_code
+                labels.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                if pair is None:
+                    pair = self._frame_pair(frame)
+                frame = frame.f_back
+            labels.append(f"[{pair or 'loop'}]")
+            stacks[";".join(reversed(labels))] += 1
+        try:
+            self._write(iteration, started, time.time() - started, stacks)
+        except Exception as e:
+            logger.warning(f"Failed to write loop profile: {e}")
+
+    def _write(self, iteration: int, started: float, duration: float, stacks: Counter) -> None:
+        stem = self.directory / f"loop_{datetime.fromtimestamp(started):%Y%m%d-%H%M%S}_{iteration}"
+        with open(f"{stem}.folded", "w") as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+        total = sum(stacks.values()) or 1
+        inclusive: Counter = Counter()
+        exclusive: Counter = Counter()
+        roots: Counter = Counter()
+        for stack, count in stacks.items():
+            frames = stack.split(";")
+            roots[frames[0]] += count
+            exclusive[frames[-1]] += count
+            for name in set(frames[1:]):
+                inclusive[name] += count
+        behind = " - BEHIND process_throttle_secs" if duration > self.throttle_secs else ""
+        lines = [
+            f"Loop iteration {iteration} at {datetime.fromtimestamp(started).isoformat()}",
+            f"Duration {duration:.2f}s (throttle {self.throttle_secs}s){behind}, "
+            f"{total} samples every {self.interval * 1000:.1f}ms",
+            "",
+            "By pair:",
+            *(f"{100 * n / total:6.1f}%  {name}" for name, n in roots.most_common()),
+            "",
+            "Top functions (inclusive / self):",
+            *(f"{100 * n / total:6.1f}% {100 * exclusive[name] / total:6.1f}%  {name}"
+              for name, n in inclusive.most_common(30)),
+        ]
+        with open(f"{stem}.txt", "w") as f:
+            f.write("\n".join(lines) + "\n")
+
+        profiles = sorted(self.directory.glob("loop_*.folded"), key=lambda path: path.stat().st_mtime)
+        for old in profiles[:-self.keep] if self.keep > 0 else []:
+            old.unlink(missing_ok=True)
+            old.with_suffix(".txt").unlink(missing_ok=True)
+        logger.info(f"Loop profile written to {stem}.folded ({duration:.2f}s, {total} samples)")
+
+
 class FreqAi_NoTank4h(IStrategy):
     exit_profit_only = True
     trailing_stop = False
@@ -40,11 +854,20 @@ class FreqAi_NoTank4h(IStrategy):
     process_only_new_candles = True
     can_short = True
     use_exit_signal = True
-    startup_candle_count: int = 200
+    # 1h/4h are resampled from these 15m candles, so the warm-up must cover the 4h
+    # features: the 64-candle Murrey window plus one partial bucket (16 x 15m per 4h)
+    startup_candle_count: int = (64 + 1) * 16
     stoploss = -0.99
     use_custom_stoploss = True
     timeframe = "15m"
     informative_timeframe = "4h"
+    # 1h/4h candles are resampled from 15m (see InformativeResampler); the caps apply live only
+    informative_min_candles = 200
+    informative_max_candles = 1000
+    # Memory-mapped per-pair snapshot for sidecars (see IndicatorSnapshot); empty disables
+    indicator_snapshot_path = os.getenv("DCA_SNAPSHOT_FILE", "/freqtrade/user_data/indicator_snapshot.bin")
+    # Sample every Nth bot loop iteration into user_data/profiles (see LoopProfiler); 0 disables
+    loop_profile_every = int(os.getenv("DCA_PROFILE_EVERY", "0"))
 
     # DCA
     initial_safety_order_trigger = DecimalParameter(
@@ -64,11 +887,25 @@ class FreqAi_NoTank4h(IStrategy):
     )
     last_entry_price = None
     
-    # DCA Confirmation tracking
-    dca_pending_confirmations = {}
-    dca_confirmed_orders = {}
-    dca_declined_orders = set()
+    # DCA Confirmation tracking (requests and decisions live in self.dca_state, see __init__)
     dca_confirmation_timeout_minutes = 10  # Auto-decline after 10 minutes without response
+    dca_confirmation_purge_minutes = 60  # Forget a request (and its decision) 1 hour after its last update
+    # Name this bot has in the webhook's DCA_BOTS; namespaces its callback buttons
+    dca_bot_name = os.getenv("DCA_BOT_NAME", "")
+    # Unix socket the webhook pushes decisions to (shared user_data volume)
+    dca_decision_socket_path = os.getenv(
+        "DCA_DECISION_SOCKET", "/freqtrade/user_data/dca_decisions.sock"
+    )
+    # Socket currently bound to that path; process-wide, a replacing instance closes it
+    _dca_decision_server = None
+    # Shared append-only span log (also written by the webhook); empty disables tracing
+    dca_trace_path = os.getenv("DCA_TRACE_FILE", "/freqtrade/user_data/dca_trace.jsonl")
+    # Simulated confirmations in backtest/hyperopt (see build_dca_policy)
+    _dca_policy = None
+    # (profit trigger, divisor of trade stake) per number of partial exits taken
+    dca_partial_exit_levels = ((0.25, 4), (0.40, 3))
+    # (params, triggers, multipliers) of the current safety-order ladder
+    _dca_ladder = (None, [], [])
 
     # Protections
     cooldown_lookback = IntParameter(2, 48, default=1, space="protection", optimize=True)
@@ -105,6 +942,27 @@ class FreqAi_NoTank4h(IStrategy):
         },
     }
 
+    def __init__(self, config: dict) -> None:
+        super().__init__(config)
+        # Per instance: strategy objects must not share DCA state through class attributes
+        # trade.id -> DCAPlan, dropped by order_filled so it is rebuilt once per fill
+        self._dca_plans: Dict[int, DCAPlan] = {}
+        self._dca_expiry = DCAExpiryScheduler()
+        self.dca_state = DCAStateStore(
+            capacity=int(config.get("dca_state_capacity", 1024)),
+            ttl=self.dca_confirmation_purge_minutes * 60,
+        )
+        # Built on first use; None = not yet, False = disabled for this run. A new
+        # instance (e.g. after /reload_config) builds its own instead of reusing these.
+        self._informative_resampler: Optional[InformativeResampler] = None
+        self._informative_index: Optional[InformativeIndex] = None
+        self._indicator_checkpoint = None
+        self._indicator_snapshot = None
+        self._loop_profiler = None
+        self._dca_decision_listener = None
+        self._dca_confirmations_cache = (None, {})
+        self._dca_message_queue: Optional[queue.Queue] = None
+
     @property
     def protections(self):
         prot = []
@@ -205,123 +1063,275 @@ class FreqAi_NoTank4h(IStrategy):
             current_exit_profit: float,
             **kwargs,
     ) -> Optional[float]:
-        filled_entries = trade.select_filled_orders(trade.entry_side)
-        count_of_entries = trade.nr_of_successful_entries
+        plan = self._dca_plan(trade)
 
-        if current_profit > 0.25 and trade.nr_of_successful_exits == 0:
-            return -(trade.stake_amount / 4)
-        if current_profit > 0.40 and trade.nr_of_successful_exits == 1:
-            return -(trade.stake_amount / 3)
+        if plan.exit_trigger is not None and current_profit > plan.exit_trigger:
+            return -plan.exit_stake
 
-        if current_profit > -0.15 and trade.nr_of_successful_entries == 1:
+        if plan.dca_order_id is None:
             return None
-        if current_profit > -0.3 and trade.nr_of_successful_entries == 2:
+        if plan.dca_trigger is not None and current_profit > plan.dca_trigger:
             return None
-        if current_profit > -0.6 and trade.nr_of_successful_entries == 3:
+
+        dca_stake = plan.dca_stake
+        dca_order_number = plan.dca_order_number
+        dca_order_id = plan.dca_order_id
+        try:
+            # Backtest/hyperopt: simulated user, no Telegram or file I/O
+            if self._dca_policy is not None:
+                return self._simulate_dca_decision(dca_order_id, current_time, dca_stake)
+
+            timestamp = current_time
+            if timestamp is not None and timestamp.tzinfo is None:
+                timestamp = timestamp.replace(tzinfo=timezone.utc)
+            now = (timestamp or datetime.now(timezone.utc)).timestamp()
+            request = self.dca_state.lookup(trade.id, dca_order_id)
+
+            # Check if already declined (pushed by the webhook or auto-declined)
+            if request is not None and request.status == DCAStateStore.DECLINED:
+                logger.info(f"DCA order {dca_order_id} was declined by user")
+                return None
+            
+            # Check if already confirmed (pushed by the webhook)
+            if request is not None and request.status == DCAStateStore.CONFIRMED:
+                logger.info(f"DCA order {dca_order_id} confirmed, executing...")
+                self.dca_state.discard(trade.id)
+                self._clear_dca_confirmation(dca_order_id)
+                self._trace_dca(dca_order_id, "picked_up", action="accept", via="push")
+                return dca_stake
+            
+            # Fallback: decision file written by the webhook
+            file_status = self._get_dca_confirmation_status(dca_order_id)
+            if file_status == "declined":
+                self.dca_state.decide(dca_order_id, DCAStateStore.DECLINED, now)
+                self._clear_dca_confirmation(dca_order_id)
+                logger.info(f"DCA order {dca_order_id} was declined (file)")
+                self._trace_dca(dca_order_id, "picked_up", action="decline", via="file")
+                return None
+            if file_status == "confirmed":
+                self.dca_state.discard(trade.id)
+                self._clear_dca_confirmation(dca_order_id)
+                logger.info(f"DCA order {dca_order_id} confirmed (file), executing...")
+                self._trace_dca(dca_order_id, "picked_up", action="accept", via="file")
+                return dca_stake
+            if file_status == "pending":
+                return None
+            
+            # Send DCA confirmation request if not already pending
+            if request is None:
+                # Registered before the message goes out: a click can only arrive after this
+                self._register_dca_confirmation(dca_order_id, trade.pair, dca_order_number, dca_stake)
+                message_ref = self._send_dca_confirmation(
+                    trade.pair, 
+                    dca_order_number, 
+                    current_rate, 
+                    dca_stake, 
+                    current_profit,
+                    dca_order_id
+                )
+                self.dca_state.request(trade.id, dca_order_id, now, message_ref)
+                self._dca_expiry.schedule(
+                    now + self.dca_confirmation_timeout_minutes * 60, trade.id, "auto_decline"
+                )
+                logger.info(f"DCA confirmation pending for {dca_order_id}")
+            
+            return None  # Wait for confirmation
+        except Exception as e:
+            logger.warning(f"Error in DCA execution: {str(e)}")
             return None
 
-        if count_of_entries <= self.max_safety_orders.value:
+    def _dca_plan(self, trade: Trade) -> DCAPlan:
+        """The trade's cached plan, rebuilt once a fill changed its entry or exit count"""
+        plan = self._dca_plans.get(trade.id)
+        if (plan is None or plan.entries != trade.nr_of_successful_entries
+                or plan.exits != trade.nr_of_successful_exits):
+            plan = self._dca_plans[trade.id] = self._build_dca_plan(trade)
+        return plan
+
+    def _build_dca_plan(self, trade: Trade) -> DCAPlan:
+        """Derive the next safety order and partial exit for a trade from its fills"""
+        entries = trade.nr_of_successful_entries
+        exits = trade.nr_of_successful_exits
+
+        exit_trigger = exit_stake = None
+        if exits < len(self.dca_partial_exit_levels):
+            exit_trigger, divisor = self.dca_partial_exit_levels[exits]
+            exit_stake = trade.stake_amount / divisor
+
+        dca_order_id = dca_stake = dca_trigger = None
+        triggers, multipliers = self._get_safety_order_ladder()
+        filled_entries = trade.select_filled_orders(trade.entry_side)
+        if filled_entries and entries <= len(triggers):
+            dca_stake = filled_entries[0].cost * multipliers[entries - 1]
+            # Ladder deviations are price moves; current_profit includes leverage
+            dca_trigger = triggers[entries - 1] * (trade.leverage or 1.0)
+            dca_order_id = f"{trade.pair}_{trade.open_date}_{entries + 1}"
+
+        return DCAPlan(entries, exits, dca_order_id, dca_stake, dca_trigger, exit_trigger, exit_stake)
+
+    def _get_safety_order_ladder(self) -> Tuple[List[float], List[float]]:
+        """Ladder for the current parameter values, recomputed only when they change"""
+        params = (
+            self.initial_safety_order_trigger.value,
+            self.safety_order_step_scale.value,
+            self.safety_order_volume_scale.value,
+            self.max_safety_orders.value,
+        )
+        if self._dca_ladder[0] != params:
+            triggers, multipliers = safety_order_ladder(*params)
+            self._dca_ladder = (params, triggers.tolist(), multipliers.tolist())
+        return self._dca_ladder[1], self._dca_ladder[2]
+
+    def bot_start(self, **kwargs) -> None:
+        """Select the simulated confirmation policy for backtest/hyperopt"""
+        if self.dp and self.dp.runmode.value in ("backtest", "hyperopt"):
+            settings = dict(self.config.get("dca_backtest_policy", {}))
+            if os.getenv("DCA_BACKTEST_POLICY"):
+                settings["mode"] = os.getenv("DCA_BACKTEST_POLICY")
+            self._dca_policy = build_dca_policy(settings)
+            self._dca_simulated_requests: Dict[str, Optional[datetime]] = {}
+            logger.info(f"DCA confirmations simulated with {self._dca_policy}")
+
+    def _simulate_dca_decision(
+            self, dca_order_id: str, current_time: datetime, dca_stake: float
+    ) -> Optional[float]:
+        """
+        Resolve a DCA request with the backtest policy. The request is "sent"
+        the first time it is seen; the decision applies once its simulated
+        delay has passed, and a delay beyond the timeout counts as auto-decline.
+        """
+        if dca_order_id not in self._dca_simulated_requests:
+            self._dca_simulated_requests[dca_order_id] = current_time
+        requested_at = self._dca_simulated_requests[dca_order_id]
+        if requested_at is None:
+            # Already executed or declined
+            return None
+        accept, delay_seconds = self._dca_policy.decide(dca_order_id)
+        if delay_seconds > self.dca_confirmation_timeout_minutes * 60:
+            accept, delay_seconds = False, self.dca_confirmation_timeout_minutes * 60
+        if (current_time - requested_at).total_seconds() < delay_seconds:
+            return None
+        self._dca_simulated_requests[dca_order_id] = None
+        return dca_stake if accept else None
+
+    @staticmethod
+    def _dca_confirmations_path() -> Path:
+        return Path(os.getenv("DCA_CONFIRMATIONS_PATH", "/freqtrade/user_data/dca_confirmations.json"))
+
+    @contextmanager
+    def _dca_confirmations_locked(self):
+        """Same lock file as the webhook's DCAConfirmationManager.locked()"""
+        path = self._dca_confirmations_path()
+        with open(path.with_name(path.name + ".lock"), "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
             try:
-                base_stake = filled_entries[0].cost
-                total_stake = base_stake / 0.3
-                dca_stake = (total_stake * 0.7) / self.max_safety_orders.value
-                dca_order_number = count_of_entries + 1
-                
-                # Create unique DCA order ID
-                dca_order_id = f"{trade.pair}_{trade.open_date}_{dca_order_number}"
-
-                file_status = self._get_dca_confirmation_status(dca_order_id)
-                if file_status == "declined":
-                    self.dca_declined_orders.add(dca_order_id)
-                    self._clear_dca_confirmation(dca_order_id)
-                    logger.info(f"DCA order {dca_order_id} was declined (file)")
-                    return None
-                if file_status == "confirmed":
-                    self._clear_dca_confirmation(dca_order_id)
-                    logger.info(f"DCA order {dca_order_id} confirmed (file), executing...")
-                    return dca_stake
-                if file_status == "pending":
-                    return None
-                
-                # Check if already declined
-                if dca_order_id in self.dca_declined_orders:
-                    logger.info(f"DCA order {dca_order_id} was declined by user")
-                    return None
-                
-                # Check if already confirmed
-                if dca_order_id in self.dca_confirmed_orders:
-                    logger.info(f"DCA order {dca_order_id} confirmed, executing...")
-                    self.dca_confirmed_orders.pop(dca_order_id)
-                    return dca_stake
-                
-                # Send DCA confirmation request if not already pending
-                if dca_order_id not in self.dca_pending_confirmations:
-                    self._send_dca_confirmation(
-                        trade.pair, 
-                        dca_order_number, 
-                        current_rate, 
-                        dca_stake, 
-                        current_profit,
-                        dca_order_id
-                    )
-                    timestamp = current_time
-                    if timestamp is not None and timestamp.tzinfo is None:
-                        timestamp = timestamp.replace(tzinfo=timezone.utc)
-                    self.dca_pending_confirmations[dca_order_id] = {
-                        'pair': trade.pair,
-                        'order_number': dca_order_number,
-                        'entry_rate': current_rate,
-                        'stake': dca_stake,
-                        'profit': current_profit,
-                        'timestamp': timestamp
-                    }
-                    logger.info(f"DCA confirmation pending for {dca_order_id}")
-                
-                return None  # Wait for confirmation
-            except Exception as e:
-                logger.warning(f"Error in DCA execution: {str(e)}")
-                return None
-        return None
+                yield path
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+    @staticmethod
+    def _write_dca_confirmations(path: Path, data: dict) -> None:
+        """Replace the decision file atomically, so readers never see a partial file"""
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_text(json.dumps(data, indent=2, default=str))
+        os.replace(tmp_path, path)
+
+    def _register_dca_confirmation(self, dca_order_id: str, pair: str, order_number: int, stake: float) -> None:
+        """Add the pending request to the decision file, so the webhook can record the click"""
+        try:
+            with self._dca_confirmations_locked() as path:
+                data = json.loads(path.read_text()) if path.exists() else {}
+                data[dca_order_id] = {
+                    "pair": pair,
+                    "order_number": order_number,
+                    "stake": stake,
+                    "status": "pending",
+                    "timestamp": datetime.now().isoformat(),
+                    "timeout_minutes": self.dca_confirmation_timeout_minutes,
+                }
+                self._write_dca_confirmations(path, data)
+        except Exception as e:
+            logger.warning(f"Failed to register DCA confirmation {dca_order_id}: {e}")
 
-    def _get_dca_confirmation_status(self, dca_order_id: str) -> str:
-        path = Path(os.getenv("DCA_CONFIRMATIONS_PATH", "/freqtrade/user_data/dca_confirmations.json"))
-        if not path.exists():
-            return ""
+    def _load_dca_confirmations(self) -> dict:
+        """Read the decision file, re-parsing it only when its mtime changes"""
+        path = self._dca_confirmations_path()
+        try:
+            mtime = path.stat().st_mtime_ns
+        except OSError:
+            return {}
+        cached_mtime, cached_data = self._dca_confirmations_cache
+        if mtime == cached_mtime:
+            return cached_data
         try:
             data = json.loads(path.read_text())
         except Exception as e:
             logger.warning(f"Failed to read DCA confirmations: {e}")
-            return ""
+            return {}
+        self._dca_confirmations_cache = (mtime, data)
+        return data
+
+    def _get_dca_confirmation_status(self, dca_order_id: str) -> str:
+        data = self._load_dca_confirmations()
         if dca_order_id not in data:
             return ""
         return str(data[dca_order_id].get("status", ""))
 
     def _clear_dca_confirmation(self, dca_order_id: str) -> None:
-        path = Path(os.getenv("DCA_CONFIRMATIONS_PATH", "/freqtrade/user_data/dca_confirmations.json"))
-        if not path.exists():
-            return
+        """Drop a consumed request; read-modify-write under the webhook's lock, replaced atomically"""
         try:
-            data = json.loads(path.read_text())
+            with self._dca_confirmations_locked() as path:
+                if not path.exists():
+                    return
+                data = json.loads(path.read_text())
+                if dca_order_id not in data:
+                    return
+                data.pop(dca_order_id, None)
+                self._write_dca_confirmations(path, data)
         except Exception as e:
-            logger.warning(f"Failed to read DCA confirmations: {e}")
-            return
-        if dca_order_id not in data:
+            logger.warning(f"Failed to clear DCA confirmation {dca_order_id}: {e}")
+
+    def _trace_dca(self, dca_order_id: str, stage: str, **fields) -> None:
+        """
+        Append a timestamped span for one DCA stage to the shared trace log.
+        A single O_APPEND write per span keeps concurrent writers from the
+        bot and the webhook from interleaving without any locking.
+        """
+        if not self.dca_trace_path:
             return
-        data.pop(dca_order_id, None)
+        span = {"ts": time.time(), "dca_id": dca_order_id, "stage": stage, "source": "strategy", **fields}
         try:
-            path.write_text(json.dumps(data, indent=2, default=str))
-        except Exception as e:
-            logger.warning(f"Failed to write DCA confirmations: {e}")
+            fd = os.open(self.dca_trace_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, (json.dumps(span, default=str) + "\n").encode())
+            finally:
+                os.close(fd)
+        except OSError as e:
+            logger.debug(f"Failed to write DCA trace span: {e}")
+
+    def order_filled(self, pair: str, trade: Trade, order, current_time: datetime, **kwargs) -> None:
+        """Invalidate the trade's DCA plan, trace DCA (safety order) fills, forget closed trades"""
+        self._dca_plans.pop(trade.id, None)
+        if not trade.is_open:
+            self.dca_state.discard(trade.id)
+        if order.ft_order_side == trade.entry_side and trade.nr_of_successful_entries > 1:
+            dca_order_id = f"{trade.pair}_{trade.open_date}_{trade.nr_of_successful_entries}"
+            self._trace_dca(dca_order_id, "filled", price=order.safe_price, cost=order.safe_cost)
 
     def _send_dca_confirmation(self, pair: str, order_number: int, entry_rate: float, 
-                               stake: float, profit: float, dca_order_id: str) -> None:
-        """Send Telegram message with Accept/Decline buttons for DCA confirmation"""
+                               stake: float, profit: float, dca_order_id: str) -> Optional[dict]:
+        """
+        Send Telegram message with Accept/Decline buttons for DCA confirmation.
+        Returns {"chat_id", "message_id"} of the sent message, if any.
+        """
         try:
             bot_token = os.getenv("DCA_BOT_TOKEN") or os.getenv("TELEGRAM_BOT_TOKEN")
             chat_id = os.getenv("TELEGRAM_CHAT_ID")
             if not bot_token or not chat_id:
                 logger.warning("TELEGRAM_BOT_TOKEN or TELEGRAM_CHAT_ID not set; cannot send DCA confirmation")
-                return
+                return None
 
             message = (
                 f"🔄 *DCA Order Confirmation Required*\n\n"
@@ -335,6 +1345,11 @@ class FreqAi_NoTank4h(IStrategy):
                 f"*Please confirm or decline this DCA order*"
             )
 
+            # Telegram caps callback_data at 64 bytes
+            callback_id = f"{self.dca_bot_name}|{dca_order_id}" if self.dca_bot_name else dca_order_id
+            if len(f"dca_decline_{callback_id}".encode()) > 64:
+                logger.warning(f"DCA callback id {callback_id} exceeds Telegram's 64 byte limit")
+
             url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
             payload = {
                 "chat_id": chat_id,
@@ -343,8 +1358,8 @@ class FreqAi_NoTank4h(IStrategy):
                 "reply_markup": {
                     "inline_keyboard": [
                         [
-                            {"text": "✅ Accept DCA", "callback_data": f"dca_accept_{dca_order_id}"},
-                            {"text": "❌ Decline DCA", "callback_data": f"dca_decline_{dca_order_id}"}
+                            {"text": "✅ Accept DCA", "callback_data": f"dca_accept_{callback_id}"},
+                            {"text": "❌ Decline DCA", "callback_data": f"dca_decline_{callback_id}"}
                         ]
                     ]
                 }
@@ -352,13 +1367,56 @@ class FreqAi_NoTank4h(IStrategy):
 
             response = requests.post(url, json=payload, timeout=10)
             response.raise_for_status()
+            self._trace_dca(dca_order_id, "requested", pair=pair, order_number=order_number)
             logger.info(
                 f"DCA confirmation request sent for {dca_order_id} "
                 f"(auto-decline in {self.dca_confirmation_timeout_minutes}min)"
             )
+            sent = response.json().get("result", {})
+            return {"chat_id": sent.get("chat", {}).get("id", chat_id), "message_id": sent.get("message_id")}
                 
         except Exception as e:
             logger.error(f"Failed to send DCA confirmation: {str(e)}")
+            return None
+
+    def _expire_dca_message(self, dca_order_id: str, message_ref: Optional[dict]) -> None:
+        """Queue the edit of an unanswered confirmation message, off the bot loop"""
+        if not message_ref or not message_ref.get("message_id"):
+            return
+        if self._dca_message_queue is None:
+            self._dca_message_queue = queue.Queue()
+            threading.Thread(
+                target=self._drain_dca_messages, args=(self._dca_message_queue,),
+                daemon=True, name="dca-message-editor",
+            ).start()
+        self._dca_message_queue.put((dca_order_id, message_ref))
+
+    def _drain_dca_messages(self, messages: queue.Queue) -> None:
+        """Worker thread: send queued message edits one at a time"""
+        while True:
+            dca_order_id, message_ref = messages.get()
+            self._send_expired_dca_message(dca_order_id, message_ref)
+
+    def _send_expired_dca_message(self, dca_order_id: str, message_ref: dict) -> None:
+        """Replace an unanswered confirmation message so its buttons go away"""
+        bot_token = os.getenv("DCA_BOT_TOKEN") or os.getenv("TELEGRAM_BOT_TOKEN")
+        if not bot_token:
+            return
+        try:
+            url = f"https://api.telegram.org/bot{bot_token}/editMessageText"
+            payload = {
+                "chat_id": message_ref["chat_id"],
+                "message_id": message_ref["message_id"],
+                "text": (
+                    f"⌛ *DCA Order Auto-Declined*\n\n"
+                    f"Order ID: {dca_order_id}\n"
+                    f"No response within {self.dca_confirmation_timeout_minutes} minutes"
+                ),
+                "parse_mode": "Markdown"
+            }
+            requests.post(url, json=payload, timeout=5)
+        except Exception as e:
+            logger.warning(f"Failed to update expired DCA message {dca_order_id}: {e}")
 
     def dca_button_handler(self, update, context) -> None:
         """Handle DCA confirmation button clicks from Telegram"""
@@ -368,88 +1426,161 @@ class FreqAi_NoTank4h(IStrategy):
         callback_data = query.data
         
         if callback_data.startswith('dca_accept_'):
-            dca_order_id = callback_data.replace('dca_accept_', '')
-            self.dca_confirmed_orders[dca_order_id] = True
-            self.dca_pending_confirmations.pop(dca_order_id, None)
+            dca_order_id = callback_data.replace('dca_accept_', '').rpartition('|')[2]
+            self.dca_state.decide(dca_order_id, DCAStateStore.CONFIRMED, time.time())
             
             message_text = f"✅ *DCA Order Confirmed*\nOrder ID: `{dca_order_id}`\n\nDCA will execute at next candle."
             query.edit_message_text(text=message_text, parse_mode='markdown')
             logger.info(f"DCA order {dca_order_id} ACCEPTED by user")
             
         elif callback_data.startswith('dca_decline_'):
-            dca_order_id = callback_data.replace('dca_decline_', '')
-            self.dca_declined_orders.add(dca_order_id)
-            self.dca_pending_confirmations.pop(dca_order_id, None)
+            dca_order_id = callback_data.replace('dca_decline_', '').rpartition('|')[2]
+            self.dca_state.decide(dca_order_id, DCAStateStore.DECLINED, time.time())
             
             message_text = f"❌ *DCA Order Declined*\nOrder ID: `{dca_order_id}`\n\nThis DCA order has been skipped."
             query.edit_message_text(text=message_text, parse_mode='markdown')
             logger.info(f"DCA order {dca_order_id} DECLINED by user")
 
     def bot_loop_start(self, **kwargs) -> None:
-        """Initialize Telegram button handlers on bot start"""
+        """Initialize Telegram button handlers on bot start, expire DCA requests every loop"""
+        if self._loop_profiler is None:
+            self._loop_profiler = self._build_loop_profiler()
+        if self._loop_profiler:
+            self._loop_profiler.loop_start()
+        current_time = kwargs.get("current_time") or datetime.now(timezone.utc)
+        self._process_dca_expiries(current_time)
         try:
             if hasattr(self, 'dp') and self.dp:
-                logger.info("DCA confirmation system initialized")
+                if self._dca_decision_listener is None:
+                    # False marks a failed start so binding is not retried every loop
+                    self._dca_decision_listener = self._start_dca_decision_listener() or False
+                    logger.info("DCA confirmation system initialized")
         except Exception as e:
             logger.warning(f"Error initializing DCA confirmation: {str(e)}")
 
-    def _cleanup_old_confirmations(self) -> None:
-        """Clean up and auto-decline DCA confirmations older than timeout period"""
-        from datetime import timedelta
-        current_time = datetime.now(timezone.utc)
-        expired_ids = []
-        auto_declined_ids = []
-
+    def _build_loop_profiler(self):
+        """LoopProfiler for live runs if enabled by DCA_PROFILE_EVERY or `loop_profile_every`, else False"""
+        every = self.loop_profile_every or int(self.config.get("loop_profile_every", 0))
+        live = self.dp is not None and self.dp.runmode.value in ("live", "dry_run")
+        if not every or not live:
+            return False
+        try:
+            profiler = LoopProfiler(
+                Path(self.config.get("user_data_dir", "user_data")) / "profiles",
+                every,
+                interval=float(self.config.get("loop_profile_interval_ms", 5)) / 1000,
+                keep=int(self.config.get("loop_profile_keep", 20)),
+                throttle_secs=float(self.config.get("internals", {}).get("process_throttle_secs", 5)),
+            )
+        except OSError as e:
+            logger.warning(f"Loop profiling disabled: {e}")
+            return False
+        logger.info(f"Profiling every {profiler.every} bot loop iteration(s) into {profiler.directory}")
+        return profiler
 
-        for dca_id, details in list(self.dca_pending_confirmations.items()):
-            timestamp = details.get('timestamp')
-            if timestamp is None:
-                continue
-            # Convert timestamp to timezone-aware UTC datetime
+    def _apply_dca_decision(self, dca_order_id: str, action: str) -> None:
+        """Record a decision pushed by the webhook in the DCA state"""
+        status = {"accept": DCAStateStore.CONFIRMED, "decline": DCAStateStore.DECLINED}.get(action)
+        if status is None:
+            return
+        self.dca_state.decide(dca_order_id, status, time.time())
+        logger.info(f"DCA order {dca_order_id} {action} received from webhook")
+        if action == "decline":
+            # Consumed here, as on the polling path; accepts are cleared (and traced)
+            # when adjust_trade_position executes them
+            self._clear_dca_confirmation(dca_order_id)
+            self._trace_dca(dca_order_id, "picked_up", action="decline", via="push")
+
+    def _start_dca_decision_listener(self) -> Optional[threading.Thread]:
+        """
+        Listen on a Unix socket for decisions pushed by the webhook.
+        One JSON object per line: {"dca_id": "...", "action": "accept"|"decline"}.
+        The decision file stays the fallback when the socket is unavailable.
+        """
+        if not hasattr(socket, "AF_UNIX") or self.dp.runmode.value not in ("live", "dry_run"):
+            return None
+        path = self.dca_decision_socket_path
+        previous = FreqAi_NoTank4h._dca_decision_server
+        if previous is not None:
+            # Listener of a replaced instance: stop it so decisions reach this instance's state
             try:
-                if isinstance(timestamp, str):
-                    # Try ISO format first
+                previous.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            previous.close()
+            FreqAi_NoTank4h._dca_decision_server = None
+        try:
+            if os.path.exists(path):
+                os.unlink(path)
+            server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            server.bind(path)
+            os.chmod(path, 0o660)
+            server.listen(16)
+        except OSError as e:
+            logger.warning(f"DCA decision socket unavailable, using file fallback: {e}")
+            return None
+        FreqAi_NoTank4h._dca_decision_server = server
+
+        def serve() -> None:
+            while True:
+                try:
+                    conn, _ = server.accept()
+                except OSError as e:
+                    if server.fileno() == -1:
+                        logger.info("DCA decision listener of a replaced strategy instance stopped")
+                    else:
+                        logger.warning(f"DCA decision socket stopped: {e}")
+                    return
+                with conn:
                     try:
-                        timestamp_dt = datetime.fromisoformat(timestamp)
-                    except Exception:
-                        # Fallback: try parsing as float seconds
-                        timestamp_dt = datetime.utcfromtimestamp(float(timestamp))
-                    if timestamp_dt.tzinfo is None:
-                        timestamp_dt = timestamp_dt.replace(tzinfo=timezone.utc)
-                elif hasattr(timestamp, 'tzinfo'):
-                    timestamp_dt = timestamp
-                    if timestamp_dt.tzinfo is None:
-                        timestamp_dt = timestamp_dt.replace(tzinfo=timezone.utc)
-                else:
-                    # Fallback: treat as UNIX timestamp
-                    timestamp_dt = datetime.utcfromtimestamp(float(timestamp)).replace(tzinfo=timezone.utc)
-            except Exception:
+                        conn.settimeout(2)
+                        buffer = b""
+                        while not buffer.endswith(b"\n") and len(buffer) < 65536:
+                            chunk = conn.recv(4096)
+                            if not chunk:
+                                break
+                            buffer += chunk
+                        for line in buffer.splitlines():
+                            if line.strip():
+                                message = json.loads(line)
+                                self._apply_dca_decision(
+                                    str(message.get("dca_id", "")), str(message.get("action", ""))
+                                )
+                        conn.sendall(b"ok\n")
+                    except Exception as e:
+                        logger.warning(f"Invalid DCA decision message: {e}")
+
+        thread = threading.Thread(target=serve, name="dca-decision-listener", daemon=True)
+        thread.start()
+        logger.info(f"Listening for DCA decisions on {path}")
+        return thread
+
+    def _process_dca_expiries(self, current_time: datetime) -> None:
+        """Auto-decline DCA requests past their timeout and evict stale DCA state"""
+        if current_time.tzinfo is None:
+            current_time = current_time.replace(tzinfo=timezone.utc)
+        now = current_time.timestamp()
+
+        evicted = self.dca_state.expire(now)
+        if evicted:
+            logger.info(f"Forgot {evicted} DCA request(s) idle for {self.dca_confirmation_purge_minutes} minutes")
+        timeout = self.dca_confirmation_timeout_minutes * 60
+        for trade_id, event in self._dca_expiry.pop_due(now):
+            request = self.dca_state.get(trade_id)
+            # Answered (or superseded) requests are no longer pending: nothing to do
+            if request is None or request.status != DCAStateStore.PENDING or request.requested_at + timeout > now:
                 continue
-            time_elapsed = current_time - timestamp_dt
-
-            # Auto-decline after timeout without response
-            if time_elapsed > timedelta(minutes=self.dca_confirmation_timeout_minutes):
-                auto_declined_ids.append(dca_id)
-                self.dca_declined_orders.add(dca_id)
-                logger.warning(
-                    f"DCA order {dca_id} auto-declined due to no confirmation within "
-                    f"{self.dca_confirmation_timeout_minutes} minutes"
-                )
-
-            # Clean up very old confirmations (1 hour)
-            if time_elapsed > timedelta(hours=1):
-                expired_ids.append(dca_id)
-                logger.info(f"Cleaning up expired DCA confirmation: {dca_id}")
-
-        # Remove auto-declined orders from pending
-        for dca_id in auto_declined_ids:
-            self.dca_pending_confirmations.pop(dca_id, None)
-
-        # Remove very old confirmations
-        for dca_id in expired_ids:
-            self.dca_pending_confirmations.pop(dca_id, None)
-            self.dca_confirmed_orders.pop(dca_id, None)
-            self.dca_declined_orders.discard(dca_id)
+            if self._get_dca_confirmation_status(request.dca_id) in ("confirmed", "declined"):
+                # Answered in time but not pushed: adjust_trade_position picks it up from the file
+                continue
+            self.dca_state.decide(request.dca_id, DCAStateStore.DECLINED, now)
+            logger.warning(
+                f"DCA order {request.dca_id} auto-declined due to no confirmation within "
+                f"{self.dca_confirmation_timeout_minutes} minutes"
+            )
+            # A late click then finds no pending request instead of confirming an expired one
+            self._clear_dca_confirmation(request.dca_id)
+            self._expire_dca_message(request.dca_id, request.message)
 
     def leverage(
             self,
@@ -489,151 +1620,64 @@ class FreqAi_NoTank4h(IStrategy):
         return self.stoploss
 
     def informative_pairs(self):
+        if self.config.get("informative_resample", True):
+            # Only pairs still waiting to seed their resampled history
+            resampler = self._informative_resampler
+            return sorted(resampler.needs_exchange) if resampler else []
         pairs = self.dp.current_whitelist()
         informative_pairs = [(pair, '1h') for pair in pairs]
         informative_pairs += [(pair, self.informative_timeframe) for pair in pairs]
         return informative_pairs
 
-    @informative('1h')
-    def populate_indicators_1h(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
-
-        dataframe["rsi"] = ta.RSI(dataframe)
-        dataframe["DI_values"] = ta.PLUS_DI(dataframe) - ta.MINUS_DI(dataframe)
-        dataframe["DI_cutoff"] = 0
-
-        maxima = np.zeros(len(dataframe))
-        minima = np.zeros(len(dataframe))
-
-        maxima[argrelextrema(dataframe["close"].values, np.greater, order=5)] = 1
-        minima[argrelextrema(dataframe["close"].values, np.less, order=5)] = 1
-
-        dataframe["maxima"] = maxima
-        dataframe["minima"] = minima
-
-        dataframe["&s-extrema"] = 0
-        min_peaks = argrelextrema(dataframe["close"].values, np.less, order=5)[0]
-        max_peaks = argrelextrema(dataframe["close"].values, np.greater, order=5)[0]
-        dataframe.loc[min_peaks, "&s-extrema"] = -1
-        dataframe.loc[max_peaks, "&s-extrema"] = 1
-
-        murrey_math_levels = calculate_murrey_math_levels(dataframe)
-        for level, value in murrey_math_levels.items():
-            dataframe[level] = value
-
-        dataframe["mmlextreme_oscillator"] = 100 * (
-                (dataframe["close"] - dataframe["[4/8]P"])
-                / (dataframe["[+3/8]P"] - dataframe["[-3/8]P"])
-        )
-        dataframe["DI_catch"] = np.where(dataframe["DI_values"] > dataframe["DI_cutoff"], 0, 1)
-
-        dataframe["minima_sort_threshold"] = dataframe["close"].rolling(window=10).min()
-        dataframe["maxima_sort_threshold"] = dataframe["close"].rolling(window=10).max()
-
-        dataframe["min_threshold_mean"] = dataframe["minima_sort_threshold"].expanding().mean()
-        dataframe["max_threshold_mean"] = dataframe["maxima_sort_threshold"].expanding().mean()
-
-        dataframe["maxima_check"] = (
-            dataframe["maxima"].rolling(4).apply(lambda x: int((x != 1).all()), raw=True).fillna(0)
-        )
-        dataframe["minima_check"] = (
-            dataframe["minima"].rolling(4).apply(lambda x: int((x != 1).all()), raw=True).fillna(0)
-        )
+    def _merge_informative(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
+        """Attach 1h/4h indicators, from resampled base candles or exchange downloads"""
+        pair = metadata["pair"]
+        # Backtests see each pair once over the whole range: nothing to extend or cap, so keep no caches
+        live = self.dp is not None and self.dp.runmode.value in ("live", "dry_run")
+        if self.config.get("informative_resample", True) and self._informative_resampler is None:
+            self._informative_resampler = InformativeResampler(
+                self.timeframe, self.informative_min_candles, self.informative_max_candles, cache=live
+            )
+        if self._informative_index is None:
+            self._informative_index = InformativeIndex(self.timeframe, cache=live)
+        attached = [dataframe]
+        for timeframe, populate in (
+                ("1h", self.populate_indicators_1h), (self.informative_timeframe, self.populate_indicators_4h)
+        ):
+            if self.config.get("informative_resample", True):
+                informative_df = self._informative_resampler.get(pair, timeframe, dataframe, self.dp)
+            else:
+                informative_df = self.dp.get_pair_dataframe(pair=pair, timeframe=timeframe).copy()
+            informative_df = populate(informative_df, metadata)
+            attached.append(self._informative_index.attach(pair, dataframe, informative_df, timeframe))
+        return pd.concat(attached, axis=1)
 
-        return dataframe
+    def populate_indicators_1h(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
+        return self._populate_features(dataframe, metadata["pair"], "1h")
 
-    @informative('4h')
     def populate_indicators_4h(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
-
-        dataframe["rsi"] = ta.RSI(dataframe)
-        dataframe["DI_values"] = ta.PLUS_DI(dataframe) - ta.MINUS_DI(dataframe)
-        dataframe["DI_cutoff"] = 0
-
-        maxima = np.zeros(len(dataframe))
-        minima = np.zeros(len(dataframe))
-
-        maxima[argrelextrema(dataframe["close"].values, np.greater, order=5)] = 1
-        minima[argrelextrema(dataframe["close"].values, np.less, order=5)] = 1
-
-        dataframe["maxima"] = maxima
-        dataframe["minima"] = minima
-
-        dataframe["&s-extrema"] = 0
-        min_peaks = argrelextrema(dataframe["close"].values, np.less, order=5)[0]
-        max_peaks = argrelextrema(dataframe["close"].values, np.greater, order=5)[0]
-        dataframe.loc[min_peaks, "&s-extrema"] = -1
-        dataframe.loc[max_peaks, "&s-extrema"] = 1
-
-        murrey_math_levels = calculate_murrey_math_levels(dataframe)
-        for level, value in murrey_math_levels.items():
-            dataframe[level] = value
-
-        dataframe["mmlextreme_oscillator"] = 100 * (
-                (dataframe["close"] - dataframe["[4/8]P"])
-                / (dataframe["[+3/8]P"] - dataframe["[-3/8]P"])
-        )
-        dataframe["DI_catch"] = np.where(dataframe["DI_values"] > dataframe["DI_cutoff"], 0, 1)
-
-        dataframe["minima_sort_threshold"] = dataframe["close"].rolling(window=10).min()
-        dataframe["maxima_sort_threshold"] = dataframe["close"].rolling(window=10).max()
-
-        dataframe["min_threshold_mean"] = dataframe["minima_sort_threshold"].expanding().mean()
-        dataframe["max_threshold_mean"] = dataframe["maxima_sort_threshold"].expanding().mean()
-
-        dataframe["maxima_check"] = (
-            dataframe["maxima"].rolling(4).apply(lambda x: int((x != 1).all()), raw=True).fillna(0)
-        )
-        dataframe["minima_check"] = (
-            dataframe["minima"].rolling(4).apply(lambda x: int((x != 1).all()), raw=True).fillna(0)
-        )
-
-        return dataframe
+        return self._populate_features(dataframe, metadata["pair"], self.informative_timeframe)
 
     def populate_indicators(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
-        # Clean up old DCA confirmations
-        self._cleanup_old_confirmations()
-
-        dataframe["rsi"] = ta.RSI(dataframe)
-        dataframe["DI_values"] = ta.PLUS_DI(dataframe) - ta.MINUS_DI(dataframe)
-        dataframe["DI_cutoff"] = 0
-
-        maxima = np.zeros(len(dataframe))
-        minima = np.zeros(len(dataframe))
-
-        maxima[argrelextrema(dataframe["close"].values, np.greater, order=5)] = 1
-        minima[argrelextrema(dataframe["close"].values, np.less, order=5)] = 1
-
-        dataframe["maxima"] = maxima
-        dataframe["minima"] = minima
-
-        dataframe["&s-extrema"] = 0
-        min_peaks = argrelextrema(dataframe["close"].values, np.less, order=5)[0]
-        max_peaks = argrelextrema(dataframe["close"].values, np.greater, order=5)[0]
-        dataframe.loc[min_peaks, "&s-extrema"] = -1
-        dataframe.loc[max_peaks, "&s-extrema"] = 1
-
-        murrey_math_levels = calculate_murrey_math_levels(dataframe)
-        for level, value in murrey_math_levels.items():
-            dataframe[level] = value
-
-        dataframe["mmlextreme_oscillator"] = 100 * (
-                (dataframe["close"] - dataframe["[4/8]P"])
-                / (dataframe["[+3/8]P"] - dataframe["[-3/8]P"])
-        )
-        dataframe["DI_catch"] = np.where(dataframe["DI_values"] > dataframe["DI_cutoff"], 0, 1)
-
-        dataframe["minima_sort_threshold"] = dataframe["close"].rolling(window=10).min()
-        dataframe["maxima_sort_threshold"] = dataframe["close"].rolling(window=10).max()
-
-        dataframe["min_threshold_mean"] = dataframe["minima_sort_threshold"].expanding().mean()
-        dataframe["max_threshold_mean"] = dataframe["maxima_sort_threshold"].expanding().mean()
-
-        dataframe["maxima_check"] = (
-            dataframe["maxima"].rolling(4).apply(lambda x: int((x != 1).all()), raw=True).fillna(0)
-        )
-        dataframe["minima_check"] = (
-            dataframe["minima"].rolling(4).apply(lambda x: int((x != 1).all()), raw=True).fillna(0)
-        )
-
+        dataframe = self._merge_informative(dataframe, metadata)
+        return self._populate_features(dataframe, metadata["pair"], self.timeframe)
+
+    def _populate_features(self, dataframe: DataFrame, pair: str, timeframe: str) -> DataFrame:
+        """Add extrema, DI and Murrey Math features, resuming from the checkpoint in live runs"""
+        if self._indicator_checkpoint is None:
+            live = self.dp is not None and self.dp.runmode.value in ("live", "dry_run")
+            directory = Path(self.config.get("user_data_dir", "user_data")) / "indicator_checkpoints"
+            # False disables checkpoints (backtest/hyperopt compute each pair once anyway)
+            self._indicator_checkpoint = (
+                IndicatorCheckpoint(directory, int(self.config.get("indicator_checkpoint_every", 16)))
+                if live and self.config.get("indicator_checkpoint", True) else False
+            )
+        if self._indicator_checkpoint:
+            features = self._indicator_checkpoint.features(pair, timeframe, dataframe)
+        else:
+            features = extrema_features(dataframe[OHLCV_COLUMNS].reset_index(drop=True))
+        for column in features.columns:
+            dataframe[column] = features[column].values
         return dataframe
 
     def populate_entry_trend(self, df: DataFrame, metadata: dict) -> DataFrame:
@@ -810,92 +1854,39 @@ class FreqAi_NoTank4h(IStrategy):
             "Minima Full Send",
         )
 
+        self._publish_snapshot(df, metadata["pair"])
         return df
 
+    def _publish_snapshot(self, dataframe: DataFrame, pair: str) -> None:
+        """Share the pair's latest indicators and signals through the snapshot file"""
+        if self._indicator_snapshot is None:
+            live = self.dp is not None and self.dp.runmode.value in ("live", "dry_run")
+            snapshot = False
+            if live and self.indicator_snapshot_path:
+                try:
+                    snapshot = IndicatorSnapshot(self.indicator_snapshot_path)
+                except OSError as e:
+                    logger.warning(f"Indicator snapshot disabled: {e}")
+            # False marks snapshots as disabled so the file is not retried every candle
+            self._indicator_snapshot = snapshot
+        if self._indicator_snapshot:
+            self._indicator_snapshot.publish(pair, dataframe)
+
 
 def calculate_murrey_math_levels(df, window_size=64):
-    rolling_max_H = df["high"].rolling(window=window_size).max()
-    rolling_min_L = df["low"].rolling(window=window_size).min()
-    max_H = rolling_max_H
-    min_L = rolling_min_L
-    def calculate_fractal(v2):
-        fractal = 0
-        if 25000 < v2 <= 250000:
-            fractal = 100000
-        elif 2500 < v2 <= 25000:
-            fractal = 10000
-        elif 250 < v2 <= 2500:
-            fractal = 1000
-        elif 25 < v2 <= 250:
-            fractal = 100
-        elif 12.5 < v2 <= 25:
-            fractal = 12.5
-        elif 6.25 < v2 <= 12.5:
-            fractal = 12.5
-        elif 3.125 < v2 <= 6.25:
-            fractal = 3.125
-        elif 1.5625 < v2 <= 3.125:
-            fractal = 3.125
-        elif 0.390625 < v2 <= 1.5625:
-            fractal = 1.5625
-        elif 0 < v2 <= 0.390625:
-            fractal = 0.1953125
-        return fractal
-
-    def calculate_x_values(v1, v2, mn, mx):
-        dmml = (v2 - v1) / 8
-        x_values = []
-        midpoints = [mn + i * dmml for i in range(8)]
-        for i in range(7):
-            x_i = (midpoints[i] + midpoints[i + 1]) / 2
-            x_values.append(x_i)
-        finalH = max(x_values)
-        return x_values, finalH
-
-    def calculate_y_values(x_values, mn):
-        y_values = []
-        for x in x_values:
-            if x > 0:
-                y = mn
-            else:
-                y = 0
-            y_values.append(y)
-        return y_values
-
-    def calculate_mml(mn, finalH, mx):
-        dmml = ((finalH - final_l) / 8) * 1.0699
-        mml = (float([mx][0]) * 0.99875) + (dmml * 3)
-        ml = []
-        for i in range(0, 16):
-            calc = mml - (dmml * (i))
-            ml.append(calc)
-        murrey_math_levels = {
-            "[-3/8]P": ml[14],
-            "[-2/8]P": ml[13],
-            "[-1/8]P": ml[12],
-            "[0/8]P": ml[11],
-            "[1/8]P": ml[10],
-            "[2/8]P": ml[9],
-            "[3/8]P": ml[8],
-            "[4/8]P": ml[7],
-            "[5/8]P": ml[6],
-            "[6/8]P": ml[5],
-            "[7/8]P": ml[4],
-            "[8/8]P": ml[3],
-            "[+1/8]P": ml[2],
-            "[+2/8]P": ml[1],
-            "[+3/8]P": ml[0],
-        }
-        return mml, murrey_math_levels
-
-    for i in range(len(df)):
-        mn = np.min(min_L.iloc[: i + 1])
-        mx = np.max(max_H.iloc[: i + 1])
-        x_values, final_h = calculate_x_values(mn, mx, mn, mx)
-        y_values = calculate_y_values(x_values, mn)
-        final_l = np.min(y_values)
-        mml, murrey_math_levels = calculate_mml(final_l, final_h, mx)
-        for level, value in murrey_math_levels.items():
-            df.at[df.index[i], level] = value
-
-    return df
+    """
+    Murrey Math levels from the lowest low / highest high of the rolling window
+    seen since the first candle of the frame. Returns {level: Series}.
+    """
+    min_l = df["low"].rolling(window=window_size).min().cummin().ffill()
+    max_h = df["high"].rolling(window=window_size).max().cummax().ffill()
+
+    # Highest of the 7 octave midpoints between min_l and max_h
+    final_h = min_l + 6.5 * (max_h - min_l) / 8
+    dmml = ((final_h - min_l) / 8) * 1.0699
+    mml = max_h * 0.99875 + dmml * 3
+    levels = [
+        "[+3/8]P", "[+2/8]P", "[+1/8]P", "[8/8]P", "[7/8]P", "[6/8]P", "[5/8]P", "[4/8]P",
+        "[3/8]P", "[2/8]P", "[1/8]P", "[0/8]P", "[-1/8]P", "[-2/8]P", "[-3/8]P",
+    ]
+    return {level: mml - dmml * i for i, level in enumerate(levels)}